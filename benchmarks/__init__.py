@@ -0,0 +1,7 @@
+"""
+Benchmarks for the bxpp, bxconv and sackspp pipelines on synthetic specimens.
+
+    python -m benchmarks --rows 200000
+    python -m benchmarks --rows 200000 --save-baseline
+    python -m benchmarks --rows 200000 --compare
+"""
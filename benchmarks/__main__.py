@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from .pipelines import run_pipelines
+from .stages import run_stages
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    regressions = list()
+    for k, t in results.items():
+        if k not in baseline:
+            continue
+        ratio = t / baseline[k]
+        flag = "REGRESSION" if ratio > 1.0 + tolerance else ""
+        if flag:
+            regressions.append(k)
+        print(f"{k:20} {baseline[k]:10.4f} {t:10.4f} {ratio:8.2f}x {flag}")
+    return regressions
+
+
+def main(cmd_args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        "benchmarks", formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-cores", "-n", type=int, default=1)
+    parser.add_argument("--only", choices=["stages", "pipelines"], default=None)
+    parser.add_argument("--workdir", type=str, default=None)
+    parser.add_argument("--baseline", type=str, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slow down fraction"
+    )
+    args = parser.parse_args(cmd_args)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        results: dict[str, float] = dict()
+        if args.only in (None, "stages"):
+            results.update(run_stages(workdir, args.rows, args.repeat))
+        if args.only in (None, "pipelines"):
+            results.update(run_pipelines(workdir, args.rows, args.n_cores))
+    print(f"{'stage':20} {'seconds':>10} {'rows/s':>12}")
+    for k, t in results.items():
+        print(f"{k:20} {t:10.4f} {args.rows / t:12.0f}")
+    if args.compare:
+        with open(args.baseline, "r") as f:
+            base = json.load(f)
+        if base["rows"] != args.rows:
+            print(f"Baseline was recorded with {base['rows']} rows, not {args.rows}")
+        print(f"\n{'stage':20} {'baseline':>10} {'current':>10} {'ratio':>9}")
+        if compare(results, base["results"], args.tolerance):
+            return 1
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "rows": args.rows,
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "pandas": pd.__version__,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Baseline written to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Check every installed compute backend against numpy on synthetic deformations
+and print the time of each kernel. Exits with an error on any mismatch.
+
+    python benchmarks/backends.py --samples 1000000
+"""
+
+import argparse
+import time
+import numpy as np
+from sacksbiax.datatypes import ComputeBackend, Precision, TimeState
+from sacksbiax.core.backends import get_backend
+
+
+def timeit(fn, repeat: int = 5) -> tuple[float, object]:
+    best, res = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, res
+
+
+def synthetic_inputs(n: int, dtype: type, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    F = np.eye(2) + rng.normal(0.0, 0.2, (n, 2, 2))
+    S = rng.normal(0.0, 50.0, (n, 2, 2))
+    S = 0.5 * (S + S.swapaxes(1, 2))
+    # Restarted clock with a few negative jumps, as in concatenated protocols
+    time = np.cumsum(rng.uniform(0.0, 0.1, n))
+    time[rng.integers(1, n, max(1, n // 1000))] = 0.0
+    # time is always float64, like in the pipeline
+    return {
+        "F": F.astype(dtype),
+        "tFinv": np.linalg.inv(F).swapaxes(1, 2).astype(dtype),
+        "f1": rng.normal(0.0, 100.0, n).astype(dtype),
+        "f2": rng.normal(0.0, 100.0, n).astype(dtype),
+        "C": np.matmul(F.swapaxes(1, 2), F).astype(dtype),
+        "S": S.astype(dtype),
+        "time": time,
+    }
+
+
+def fix_time_chunked(fix_time, time: np.ndarray, chunks: int = 7) -> np.ndarray:
+    state = TimeState()
+    return np.concatenate([fix_time(t, state) for t in np.array_split(time, chunks)])
+
+
+def kernels(backend, x: dict[str, np.ndarray]):
+    return {
+        "kinematics": lambda: backend.kinematics(x["F"]),
+        "stretches": lambda: backend.stretches(x["F"]),
+        "stress": lambda: backend.stress(x["tFinv"], x["f1"], x["f2"]),
+        "energy": lambda: backend.energy(x["C"], x["S"]),
+        "fix_time": lambda: fix_time_chunked(backend.fix_time, x["time"]),
+    }
+
+
+def matches(ref, res, rtol: float) -> bool:
+    if isinstance(ref, tuple):
+        return all(matches(a, b, rtol) for a, b in zip(ref, res, strict=True))
+    if ref.dtype != res.dtype:
+        return False
+    # Cumulative sums are compared on their own scale
+    atol = rtol * max(1.0, float(np.max(np.abs(ref), initial=0.0)))
+    return np.allclose(ref, res, rtol=rtol, atol=atol)
+
+
+def main(cmd_args: list[str] | None = None):
+    parser = argparse.ArgumentParser("backends")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--precision",
+        type=str.upper,
+        default="FLOAT64",
+        choices=list(Precision.__members__),
+    )
+    parser.add_argument("--rtol", type=float, default=None)
+    args = parser.parse_args(cmd_args)
+    precision = Precision[args.precision]
+    if args.rtol is None:
+        args.rtol = 1e-9 if precision is Precision.FLOAT64 else 1e-4
+    x = synthetic_inputs(args.samples, precision.dtype)
+    numpy = kernels(get_backend(ComputeBackend.NUMPY), x)
+    reference = {k: timeit(fn, args.repeat) for k, fn in numpy.items()}
+    print(f"samples: {args.samples}, precision: {precision}")
+    failed = []
+    for name in ComputeBackend:
+        backend = get_backend(name)
+        if backend.name != name:
+            print(f"{name}: not installed, skipped")
+            continue
+        print(f"{name}")
+        print(f"  {'kernel':12} {'numpy [ms]':>11} {'time [ms]':>11} {'speed-up':>9}")
+        for k, fn in kernels(backend, x).items():
+            fn()  # compile or warm up outside of the timing
+            t_ker, res = timeit(fn, args.repeat)
+            t_ref, ref = reference[k]
+            ok = matches(ref, res, args.rtol)
+            if not ok:
+                failed.append(f"{name}.{k}")
+            print(
+                f"  {k:12} {1e3 * t_ref:11.2f} {1e3 * t_ker:11.2f} "
+                f"{t_ref / t_ker:8.1f}x{'' if ok else '  MISMATCH'}"
+            )
+    if failed:
+        raise SystemExit(f"backends do not match numpy: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
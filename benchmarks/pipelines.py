@@ -0,0 +1,46 @@
+"""
+End-to-end wall time of the bxpp, bxconv and sackspp console entry points.
+"""
+
+import os
+import time
+from glob import glob
+from sacksbiax import bxconv, bxpp, sackspp
+from .synthetic import make_kamenskiy_frame, write_kamenskiy_specimen
+from .synthetic import write_sacks_specimen
+
+
+def run_cli(main_cli, args: list[str], expect: str) -> float:
+    for f in glob(expect):
+        os.remove(f)
+    start = time.perf_counter()
+    main_cli(args)
+    elapsed = time.perf_counter() - start
+    # main_cli logs exceptions instead of raising, so check the export exists
+    if not glob(expect):
+        raise RuntimeError(f"{args[0]} produced no export matching {expect}")
+    return elapsed
+
+
+def run_pipelines(workdir: str, n_rows: int, cores: int = 1) -> dict[str, float]:
+    folder = os.path.join(workdir, "pipelines")
+    name = write_kamenskiy_specimen(folder, make_kamenskiy_frame(n_rows))
+    sacks = write_sacks_specimen(os.path.join(workdir, "sacks"), n_rows)
+    common = ["--overwrite", "--log-level", "ERROR", "--n-cores", str(cores)]
+    res: dict[str, float] = dict()
+    res["bxpp"] = run_cli(
+        bxpp.main_cli,
+        [name, "--no-cache", "--tag", "bxpp", *common],
+        os.path.join(folder, "bxpp - corrected.csv"),
+    )
+    res["bxconv"] = run_cli(
+        bxconv.main_cli,
+        [name, "--no-cache", "--tag", "bxconv", *common],
+        os.path.join(folder, "bxconv - corrected.csv"),
+    )
+    res["sackspp"] = run_cli(
+        sackspp.main_cli,
+        [sacks, "--tag", "sackspp", *common],
+        os.path.join(sacks, "sackspp - corrected.csv"),
+    )
+    return res
@@ -0,0 +1,86 @@
+"""
+Wall time of each pipeline stage on one synthetic Kamenskiy style specimen.
+"""
+
+import os
+import time
+from typing import Any, Callable
+import numpy as np
+from sacksbiax.core import *
+from sacksbiax.core.biax import BiaxialKinematics
+from sacksbiax.converter.core import (
+    convert_df_2_bx,
+    find_reference_markers_every,
+    get_specimen_info,
+)
+from sacksbiax.datatypes import FileFormat
+from .synthetic import make_kamenskiy_frame, write_kamenskiy_specimen
+
+
+def best_of(
+    fn: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None, repeat: int = 3
+) -> float:
+    # setup runs outside the timed region, e.g. to hand fn a fresh copy
+    best = np.inf
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_stages(workdir: str, n_rows: int, repeat: int = 3) -> dict[str, float]:
+    folder = os.path.join(workdir, "stages")
+    name = write_kamenskiy_specimen(folder, make_kamenskiy_frame(n_rows))
+    setting = parse_cmdline_args([name, "--export-format", "CSV"]).settings
+    res: dict[str, float] = dict()
+    res["import_csv"] = best_of(
+        lambda _: read_bx_dataframe(name, FileFormat.CSV), repeat=repeat
+    )
+    import_bx_dataframe(name, FileFormat.CSV, cache=True)
+    res["import_cached"] = best_of(
+        lambda _: import_bx_dataframe(name, FileFormat.CSV, cache=True), repeat=repeat
+    )
+    raw = read_bx_dataframe(name, FileFormat.CSV)
+    time_s = raw["Time_S"].to_numpy(dtype=float)
+    res["repair"] = best_of(
+        lambda df: repair_frame_by_interpolation(time_s, df, list(df.columns[3:])),
+        lambda: raw.copy(),
+        repeat=repeat,
+    )
+    res["cycle_types"] = best_of(lambda _: sort_data_cycle_types(raw), repeat=repeat)
+    spec = get_specimen_info(raw)
+    data = convert_df_2_bx(raw)
+    def_grad = BiaxialKinematics(*find_reference_markers_every(raw))
+    res["kinematics"] = best_of(
+        lambda _: compute_kinematics_with_origin(def_grad, spec, data), repeat=repeat
+    )
+    kin, origin = compute_kinematics_with_origin(def_grad, spec, data)
+    res["kinetics_cauchy"] = best_of(
+        lambda _: compute_kinetics_cauchy(spec, kin, origin, data), repeat=repeat
+    )
+    res["kinetics_pk1"] = best_of(
+        lambda _: compute_kinetics_pk1(spec, kin, origin, data), repeat=repeat
+    )
+    sig = compute_kinetics_cauchy(spec, kin, origin, data)
+    res["energy"] = best_of(lambda _: compute_energy(kin, sig), repeat=repeat)
+    res["shear_angle"] = best_of(lambda _: compute_shear_angle(kin), repeat=repeat)
+    tags = sort_data_cycle_types(raw)
+    erg = compute_energy(kin, sig)
+    shear = compute_shear_angle(kin)
+    res["output_frame"] = best_of(
+        lambda _: export_prepped_format(
+            data, tags, kin, sig, erg, shear, "bench", raw["Cycle"]
+        ),
+        repeat=repeat,
+    )
+    df = export_prepped_format(data, tags, kin, sig, erg, shear, "bench", raw["Cycle"])
+    res["fix_time"] = best_of(
+        lambda _: fix_time(df["Time_S"].to_numpy(dtype=float)), repeat=repeat
+    )
+    ex_name = os.path.join(folder, "export.csv")
+    res["export_csv"] = best_of(
+        lambda _: export_bx_dataframe(ex_name, df, setting), repeat=repeat
+    )
+    return res
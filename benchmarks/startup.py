@@ -0,0 +1,84 @@
+"""
+Startup time of the console scripts, measured with python -X importtime in a
+fresh interpreter. The help and all-skipped runs must not load any of the heavy
+numerical packages, the full pipeline import is printed for reference.
+
+    python benchmarks/startup.py --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Only needed once there is a specimen to process
+HEAVY = ("numpy", "pandas", "scipy", "matplotlib", "pyarrow", "numba", "numexpr")
+
+
+def run_importtime(code: str) -> tuple[float, float, set[str]]:
+    start = time.perf_counter()
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if res.returncode != 0:
+        raise RuntimeError(f"{code} failed:\n{res.stderr}")
+    total, modules = 0.0, set()
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        total += float(self_us)
+        modules.add(name.strip().split(".")[0])
+    return wall, 1e-6 * total, modules
+
+
+def make_skipped_specimens(root: str) -> tuple[str, str]:
+    # the exports already exist, so every specimen is skipped
+    kamenskiy = os.path.join(root, "kamenskiy")
+    sacks = os.path.join(root, "sacks")
+    os.makedirs(kamenskiy)
+    os.makedirs(sacks)
+    for name in ["specimen.csv", "All data - corrected.csv"]:
+        open(os.path.join(kamenskiy, name), "w").close()
+    open(os.path.join(sacks, "All data - corrected.csv"), "w").close()
+    return os.path.join(kamenskiy, "specimen.csv"), sacks
+
+
+def main(cmd_args: list[str] | None = None):
+    parser = argparse.ArgumentParser("startup")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(cmd_args)
+    with tempfile.TemporaryDirectory() as tmp:
+        kamenskiy, sacks = make_skipped_specimens(tmp)
+        cases = {
+            "bxpp -h": "from sacksbiax.cli import bxpp\ntry: bxpp(['-h'])\nexcept SystemExit: pass",
+            "bxpp skipped": f"from sacksbiax.cli import bxpp; bxpp([{kamenskiy!r}, '--log-level', 'NULL'])",
+            "bxconv skipped": f"from sacksbiax.cli import bxconv; bxconv([{kamenskiy!r}, '--log-level', 'NULL'])",
+            "sackspp skipped": f"from sacksbiax.cli import sackspp; sackspp([{sacks!r}, '--log-level', 'NULL'])",
+            "bxpp pipeline": "import sacksbiax.bxpp",
+            "sackspp pipeline": "import sacksbiax.sackspp",
+        }
+        failed = []
+        print(f"{'case':18} {'wall [ms]':>10} {'imports [ms]':>13}  heavy modules")
+        for name, code in cases.items():
+            results = [run_importtime(code) for _ in range(args.repeat)]
+            wall = min(r[0] for r in results)
+            imports = min(r[1] for r in results)
+            heavy = sorted(m for m in results[0][2] if m in HEAVY)
+            if heavy and "pipeline" not in name:
+                failed.append(name)
+            print(
+                f"{name:18} {1e3 * wall:10.1f} {1e3 * imports:13.1f}  "
+                f"{', '.join(heavy) or '-'}"
+            )
+    if failed:
+        raise SystemExit(f"heavy modules loaded at startup: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
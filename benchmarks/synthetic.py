@@ -0,0 +1,134 @@
+"""
+Synthetic specimens in the two input layouts: Kamenskiy style spreadsheets for
+bxpp/bxconv and Sacks' directory trees of t_*.bx cycle files for sackspp.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+PROTOCOL_KINDS = [
+    "Preconditioning",
+    "Equibiaxial",
+    "1-0.75 Biaxial",
+    "0.75-1 Biaxial",
+    "Stress relaxation",
+]
+# Marker positions of the 2x2 node layout, as (x, y) per node in the file order
+MARKERS_MM = np.array([[-1.0, -1.0], [-1.0, 1.0], [1.0, -1.0], [1.0, 1.0]])
+SACKS_MARKERS_MM = np.array([[1.0, 1.0], [-1.0, 1.0], [-1.0, -1.0], [1.0, -1.0]])
+
+
+def loading_curve(n: int, cycles: int, peak: float) -> np.ndarray:
+    phase = np.linspace(0.0, 2.0 * np.pi * cycles, n, endpoint=False)
+    return 1.0 + 0.5 * peak * (1.0 - np.cos(phase))
+
+
+def protocol_rows(n_rows: int, n_protocols: int) -> list[int]:
+    base = np.full(n_protocols, n_rows // n_protocols)
+    base[: n_rows % n_protocols] += 1
+    return base.tolist()
+
+
+def make_kamenskiy_frame(
+    n_rows: int,
+    n_protocols: int = 10,
+    cycles: int = 5,
+    dim: tuple[float, float, float] = (10.0, 10.0, 0.5),
+    seed: int = 0,
+) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frames = list()
+    for k, n in enumerate(protocol_rows(n_rows, n_protocols)):
+        name = f"{k + 1:02d} - {PROTOCOL_KINDS[k % len(PROTOCOL_KINDS)]}"
+        per = max(n // (2 * cycles + 1), 1)
+        labels = np.array(
+            [f"{c + 1}-{s}" for c in range(cycles) for s in ("Stretch", "Recover")]
+        )
+        steps = np.arange(n - per) * (2 * cycles) // max(n - per, 1)
+        cycle = np.concatenate([np.full(per, "Preload"), labels[steps]])
+        lx = loading_curve(n, cycles, 0.2 * (1 + k % 3) / 3)
+        ly = loading_curve(n, cycles, 0.2 * (1 + (k + 1) % 3) / 3)
+        kx = 0.01 * np.sin(np.linspace(0.0, np.pi, n))
+        ky = np.zeros(n)
+        fx = 5.0 + 800.0 * (lx - 1.0) + rng.normal(0.0, 0.1, n)
+        fy = 5.0 + 800.0 * (ly - 1.0) + rng.normal(0.0, 0.1, n)
+        df = {
+            "SetName": np.full(n, name),
+            "Cycle": cycle,
+            "Time_S": np.arange(n) * 0.01,
+            "XSize_um": 1000.0 * dim[0] * lx,
+            "YSize_um": 1000.0 * dim[1] * ly,
+            "XDisplacement_um": 1000.0 * dim[0] * (lx - 1.0),
+            "YDisplacement_um": 1000.0 * dim[1] * (ly - 1.0),
+            "XForce_mN": fx,
+            "YForce_mN": fy,
+            "Temperature": np.full(n, 37.0),
+        }
+        for i, (x, y) in enumerate(MARKERS_MM):
+            df[f"X{i + 1}"] = 1000.0 * (lx * x + kx * y)
+            df[f"Y{i + 1}"] = 1000.0 * (ky * x + ly * y)
+        df["lx"] = lx
+        df["StressXX_kPa"] = fx * lx / dim[1] / dim[2]
+        df["ly"] = ly
+        df["StressYY_kPa"] = fy * ly / dim[0] / dim[2]
+        df["Shear_angle_deg"] = np.degrees(np.arctan(kx))
+        df["kx"] = kx
+        df["StressXY_kPa"] = np.zeros(n)
+        df["ky"] = ky
+        df["StressYX_kPa"] = np.zeros(n)
+        frames.append(pd.DataFrame(df))
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_kamenskiy_specimen(
+    folder: str, df: pd.DataFrame, fmt: str = "csv", name: str = "01 - All data"
+) -> str:
+    os.makedirs(folder, exist_ok=True)
+    match fmt:
+        case "csv":
+            file = os.path.join(folder, f"{name}.csv")
+            df.to_csv(file, index=False)
+        case "xlsx":
+            file = os.path.join(folder, f"{name}.xlsx")
+            with pd.ExcelWriter(file, engine="xlsxwriter") as writer:
+                for k, (_, g) in enumerate(df.groupby("SetName", sort=False)):
+                    g.to_excel(writer, sheet_name=f"Sheet{k + 1}", index=False)
+        case _:
+            raise ValueError(f"Format {fmt} not supported")
+    return file
+
+
+def write_sacks_specimen(
+    folder: str,
+    n_rows: int,
+    n_protocols: int = 5,
+    cycles: int = 5,
+    dim: tuple[float, float, float] = (10.0, 10.0, 0.5),
+    seed: int = 0,
+) -> str:
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "size.txt"), "w") as f:
+        f.write(f"x={dim[0]}\ny={dim[1]}\nh={dim[2]}\nx-axial\n")
+    for k, n in enumerate(protocol_rows(n_rows, n_protocols)):
+        d = os.path.join(folder, f"{k + 1}-{1 + k % 2}-{1 + (k + 1) % 2}")
+        os.makedirs(d, exist_ok=True)
+        markers = np.concatenate([SACKS_MARKERS_MM[:, 0], SACKS_MARKERS_MM[:, 1]])
+        np.savetxt(os.path.join(d, "marker.ref"), markers[None, :], fmt="%.6f")
+        for c, m in enumerate(protocol_rows(n, cycles), start=1):
+            lx = loading_curve(m, 1, 0.1 * (1 + k % 2))
+            ly = loading_curve(m, 1, 0.1 * (1 + (k + 1) % 2))
+            table = np.zeros((m, 28))
+            table[:, 0] = np.arange(m) * 0.01
+            table[:, 1] = lx
+            table[:, 2] = ly
+            table[:, 4] = 0.5 + 80.0 * (lx - 1.0) + rng.normal(0.0, 0.01, m)
+            table[:, 5] = 0.5 + 80.0 * (ly - 1.0) + rng.normal(0.0, 0.01, m)
+            table[:, 8] = 9.80665 * table[:, 4] * lx / dim[1] / dim[2]
+            table[:, 9] = 9.80665 * table[:, 5] * ly / dim[0] / dim[2]
+            for i, (x, y) in enumerate(SACKS_MARKERS_MM):
+                table[:, 10 + i] = lx * x
+                table[:, 19 + i] = ly * y
+            np.savetxt(os.path.join(d, f"t_{c} .bx"), table, fmt="%.6f")
+    return folder
@@ -0,0 +1,85 @@
+"""
+Compare each closed form 2x2 kernel with the einsum expression it replaced on a
+stack of random, well conditioned tensors.
+
+    python benchmarks/tensor.py --samples 1000000
+"""
+
+import argparse
+import time
+import numpy as np
+from sacksbiax.core.tensor import *
+
+
+def timeit(fn, repeat: int = 5) -> tuple[float, np.ndarray]:
+    best, res = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, res
+
+
+def synthetic_tensors(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    A = np.eye(2) + rng.normal(0.0, 0.2, (n, 2, 2))
+    B = np.eye(2) + rng.normal(0.0, 0.2, (n, 2, 2))
+    return A, B
+
+
+def main(cmd_args: list[str] | None = None):
+    parser = argparse.ArgumentParser("tensor")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(cmd_args)
+    A, B = synthetic_tensors(args.samples)
+    mat, vec, cols = np.empty_like(A), np.empty(len(A)), np.empty((len(A), 2))
+    det = det2(A)
+    cases = {
+        "det2": (
+            lambda: np.linalg.det(A),
+            lambda: det2(A, out=vec),
+        ),
+        "inv2": (
+            lambda: np.linalg.inv(A),
+            lambda: inv2(A, det, out=mat),
+        ),
+        "mul2": (
+            lambda: np.einsum("mij,mjk->mik", A, B),
+            lambda: mul2(A, B, out=mat),
+        ),
+        "mul2_tn": (
+            lambda: np.einsum("mji,mjk->mik", A, B),
+            lambda: mul2_tn(A, B, out=mat),
+        ),
+        "mul2_nt": (
+            lambda: np.einsum("mij,mkj->mik", A, B),
+            lambda: mul2_nt(A, B, out=mat),
+        ),
+        "sym2": (
+            lambda: 0.5 * (A + np.einsum("mij->mji", A)),
+            lambda: sym2(A, out=mat),
+        ),
+        "colnorm2": (
+            lambda: np.sqrt(np.einsum("mij,mij->mj", A, A)),
+            lambda: colnorm2(A, out=cols),
+        ),
+        "coldot2": (
+            lambda: np.einsum("mi,mi->m", A[:, :, 0], A[:, :, 1]),
+            lambda: coldot2(A, out=vec),
+        ),
+    }
+    print(f"samples: {args.samples}")
+    print(f"{'kernel':10} {'einsum [ms]':>12} {'kernel [ms]':>12} {'speed-up':>9}")
+    for name, (reference, kernel) in cases.items():
+        t_ref, ref = timeit(reference, args.repeat)
+        t_ker, res = timeit(kernel, args.repeat)
+        if not np.allclose(ref, res, rtol=1e-12, atol=1e-12):
+            raise ValueError(f"{name} does not match its einsum equivalent")
+        print(
+            f"{name:10} {1e3 * t_ref:12.2f} {1e3 * t_ker:12.2f} {t_ref / t_ker:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,181 @@
-from .core.biax import BiaxialKinematics
+from .cli import run
 from .tools.logging import BasicLogger
+from .tools.scheduler import map_ordered, process_pool, profiled_call
+from .tools.shared import SharedFrame, SharedFrameHandle
 from .datatypes import *
 from .core import *
 from .converter.core import (
+    ReferenceState,
     convert_df_2_bx,
-    find_reference_markers_auto,
-    find_reference_markers_every,
-    find_reference_markers_first,
     get_specimen_info,
 )
 import pandas as pd
 from concurrent import futures
+from typing import Iterator
 
 
 def compile_protocol_data(
     t: BXProtocol,
     raw: pd.DataFrame,
+    index: SpecimenIndex,
+    ref: ReferenceState,
     spec: SpecimenInfo,
     setting: ProgramSettings,
     log: BasicLogger,
 ) -> pd.DataFrame | None:
     log.debug(f"Working on cycle {t.name}")
-    cycle = raw[raw["SetName"] == t.name]
+    cycle = raw.iloc[index.rows(t.name)]
     log.debug(f"Sorting Data")
-    tags = sort_data_cycle_types(cycle)
-    data = convert_df_2_bx(cycle)
+    tags = index.cycle_types(t.name)
+    data = convert_df_2_bx(cycle, setting.precision.dtype)
     log.debug(f"Computing kinematics")
-    match setting.ref_state:
-        case ReferenceStateOption.AUTO:
-            x_ref, y_ref = find_reference_markers_auto(raw)
-        case ReferenceStateOption.EVERY:
-            x_ref, y_ref = find_reference_markers_every(cycle)
-        case ReferenceStateOption.FIRST:
-            x_ref, y_ref = find_reference_markers_first(raw)
-    def_grad = BiaxialKinematics(x_ref, y_ref)
-    kinematics = compute_kinematics(def_grad, data)
+    def_grad = ref.kinematics(cycle)
+    n = len(cycle)
+    with log.stage("kinematics", n):
+        kinematics, origin = compute_kinematics_with_origin(
+            def_grad, spec, data, setting.backend
+        )
     log.debug(f"Computing kinetics using {setting.stress_method}")
-    match setting.stress_method:
-        case StressMethodOption.CAUCHY:
-            kinetics = compute_kinetics_cauchy(spec, kinematics, data)
-        case StressMethodOption.PK1:
-            kinetics = compute_kinetics_pk1(spec, kinematics, data)
-        case StressMethodOption.NOMINAL:
-            kinetics = compute_kinetics_nominal(spec, kinematics, data)
+    with log.stage("kinetics", n):
+        match setting.stress_method:
+            case StressMethodOption.CAUCHY:
+                kinetics = compute_kinetics_cauchy(
+                    spec, kinematics, origin, data, setting.cores, setting.backend
+                )
+            case StressMethodOption.PK1:
+                kinetics = compute_kinetics_pk1(
+                    spec, kinematics, origin, data, setting.backend
+                )
+            case StressMethodOption.NOMINAL:
+                kinetics = compute_kinetics_nominal(
+                    spec, kinematics, origin, data, setting.backend
+                )
     log.debug(f"Computing energy")
-    energy = compute_energy(kinematics, kinetics)
+    with log.stage("energy", n):
+        energy = compute_energy(kinematics, kinetics, setting.backend)
     log.debug(f"Computing shear angle")
-    shear = compute_shear_angle(kinematics)
+    with log.stage("shear", n):
+        shear = compute_shear_angle(kinematics)
     log.debug(f"Compiling data from cycle")
-    df = export_prepped_format(data, tags, kinematics, kinetics, energy, shear)
-    df["SetName"] = t.name
-    df["Cycle"] = cycle["Cycle"]
-    df = df[[s.name for s in dc.fields(SpecDataFormat)]]
+    with log.stage("output", n):
+        df = export_prepped_format(
+            data, tags, kinematics, kinetics, energy, shear, t.name, cycle["Cycle"]
+        )
     log.debug(f"Finished processing cycle!")
     return df
 
 
+def compile_shared_protocol_data(
+    t: BXProtocol,
+    handle: SharedFrameHandle,
+    index: SpecimenIndex,
+    ref: ReferenceState,
+    spec: SpecimenInfo,
+    setting: ProgramSettings,
+    log: BasicLogger,
+) -> pd.DataFrame | None:
+    with SharedFrame(handle) as shared:
+        return compile_protocol_data(t, shared.frame, index, ref, spec, setting, log)
+
+
+def compile_specimen_data(
+    raw: pd.DataFrame,
+    index: SpecimenIndex,
+    ref: ReferenceState,
+    spec: SpecimenInfo,
+    setting: ProgramSettings,
+    log: BasicLogger,
+    pool: futures.Executor | None = None,
+) -> Iterator[pd.DataFrame | None]:
+    tests = [t for _, t in sorted(spec.tests.items())]
+    if pool is None or len(tests) < 2:
+        # in-process, so the stress solve can thread over setting.cores
+        yield from map_ordered(
+            compile_protocol_data,
+            [(t, raw, index, ref, spec, setting, log) for t in tests],
+        )
+        return
+    # each worker process owns a single core, so no nested stress threads
+    worker = dc.replace(setting, cores=1)
+    # Workers attach to the numeric block instead of unpickling their own raw
+    with SharedFrame.create(raw) as shared:
+        yield from map_ordered(
+            compile_shared_protocol_data,
+            [
+                (t, shared.handle, index.only(t.name), ref, spec, worker, log)
+                for t in tests
+            ],
+            [len(index.protocols[t.name].cycle_codes) for t in tests],
+            pool,
+            log,
+            setting.cores,
+        )
+
+
 def main_loop(
     name: str,
     setting: ProgramSettings,
     log: BasicLogger,
+    pool: futures.Executor | None = None,
 ):
     ex_name = create_export_name(name, setting)
     if ex_name is None:
         log.info(f"{name} already processed, skipped.")
         return
     log.info(f"Working on specimen {name}")
-    raw = import_bx_dataframe(name, setting.input_format)
+    log.specimen, mark = name, len(log.records)
+    raw = import_bx_dataframe(name, setting.input_format, setting.cache, log)
+    repaired = {k: n for k, n in raw.attrs["repaired"].items() if n > 0}
+    if repaired:
+        log.info(f"Missing values repaired by interpolation: {repaired}")
+    with log.stage("index", len(raw)):
+        index = build_specimen_index(raw)
+        ref = ReferenceState(raw, index, setting.ref_state)
     spec = get_specimen_info(raw)
-    df = pd.concat(
-        [
-            compile_protocol_data(t, raw, spec, setting, log)
-            for _, t in sorted(spec.tests.items())
-        ],
-        ignore_index=True,
-    )
-    log.debug(f"Fixing Time array to always increasing")
-    df["Time_S"] = fix_time(df["Time_S"].to_numpy(dtype=float))
     log.info(f"Exporting results to {setting.export_format}: {ex_name}")
-    export_bx_dataframe(ex_name, df, setting)
+    clock = TimeState()
+    with StreamingExporter(ex_name, setting) as export:
+        for df in compile_specimen_data(raw, index, ref, spec, setting, log, pool):
+            if df is None:
+                continue
+            log.debug(f"Fixing Time array to always increasing")
+            df["Time_S"] = fix_time(
+                df["Time_S"].to_numpy(dtype=float), clock, setting.backend
+            )
+            with log.stage("export", len(df)):
+                export.write(df)
+    if setting.profile:
+        log.write_report(create_report_name(ex_name), log.records[mark:])
     log.info(f"{name} complete!!!\n")
 
 
-def main(args: InputArgs, log: BasicLogger):
+def main(
+    args: InputArgs,
+    log: BasicLogger,
+    pool: futures.ProcessPoolExecutor | None = None,
+):
+    backend = get_backend(args.settings.backend)
+    if backend.name != args.settings.backend:
+        log.warn(f"{args.settings.backend} is not installed, using {backend.name}")
+        args.settings.backend = backend.name
     if args.settings.cores > 1:
         future_pool = dict()
-        with futures.ProcessPoolExecutor(args.settings.cores) as exec:
+        with process_pool(args.settings.cores, pool) as exec:
+            if len(args.directory) < args.settings.cores:
+                # Too few specimens to fill the pool, fan out over protocols instead
+                for name in args.directory:
+                    main_loop(name, args.settings, log, pool=exec)
+                return
+            # each worker process owns a single core, so no nested stress threads
+            setting = dc.replace(args.settings, cores=1)
             for name in args.directory:
                 future_pool[
-                    exec.submit(main_loop, name=name, setting=args.settings, log=log)
+                    exec.submit(profiled_call, main_loop, log, (name, setting, log))
                 ] = name
             for future in futures.as_completed(future_pool):
                 try:
-                    future.result()
+                    _, records = future.result()
+                    log.records.extend(records)
                 except KeyboardInterrupt:
                     print("canceling jobs, please wait")
                     exec.shutdown(wait=True, cancel_futures=True)
@@ -105,12 +188,7 @@ def main(args: InputArgs, log: BasicLogger):
 
 
 def main_cli(cmd_args: list[str] | None = None):
-    args = parse_cmdline_args(cmd_args)
-    log = BasicLogger(args.loglevel)
-    try:
-        main(args, log)
-    except Exception as e:
-        log.exception(e)
+    run("bxpp", cmd_args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""
+Console scripts. Only the argument parser and the logger are loaded up front, the
+pipeline with pandas and the compute backends is imported once a specimen is
+actually left to process. See benchmarks/startup.py.
+"""
+
+__all__ = ["bxconv", "bxpp", "run", "sackspp"]
+import dataclasses as dc
+import importlib
+from contextlib import nullcontext
+from glob import glob
+from typing import Literal
+from .tools.logging import BasicLogger
+from .tools.scheduler import process_pool
+from .tools.watch import FileWatcher
+from .datatypes import *
+from .parsers.cmdline import create_export_name, expand_names, parse_cmdline_args
+
+
+def pending_specimens(
+    args: InputArgs, log: BasicLogger, arg_type: Literal["file", "dir"]
+) -> list[str]:
+    pending = list()
+    for name in args.directory:
+        if create_export_name(name, args.settings, arg_type) is None:
+            log.info(f"{name} already processed, skipped.")
+        else:
+            pending.append(name)
+    return pending
+
+
+def watched_files(args: InputArgs, arg_type: Literal["file", "dir"]) -> list[str]:
+    match arg_type:
+        case "file":
+            ext = [
+                k
+                for k, fmt in FILE_FORMAT_EXTENSIONS.items()
+                if args.settings.input_format in (FileFormat.AUTO, fmt)
+            ]
+            # hidden caches, office lock files and our own exports are not inputs
+            ignore = (".", "~$", f"{args.settings.tag} - ")
+            return [
+                s
+                for s in expand_names(args.patterns, "file")
+                if os.path.splitext(s)[1] in ext
+                and not os.path.basename(s).startswith(ignore)
+            ]
+        case "dir":
+            return [
+                s
+                for name in expand_names(args.patterns, "dir")
+                for s in glob(path(name, "*", "t_*.bx"))
+            ]
+
+
+def watched_specimen(name: str, arg_type: Literal["file", "dir"]) -> str:
+    match arg_type:
+        case "file":
+            return name
+        case "dir":
+            # specimen/protocol/t_*.bx
+            return os.path.dirname(os.path.dirname(name))
+
+
+def watch_root(pattern: str) -> str:
+    "Deepest folder of a glob pattern that has no wildcards"
+    while any(c in pattern for c in "*?["):
+        pattern = os.path.dirname(pattern)
+    if not os.path.isdir(pattern):
+        pattern = os.path.dirname(pattern)
+    return pattern or "."
+
+
+def watch(
+    program: str,
+    args: InputArgs,
+    log: BasicLogger,
+    arg_type: Literal["file", "dir"],
+):
+    module = importlib.import_module(f".{program}", __package__)
+    # Modified inputs replace their export, sackspp recomputes only the protocols
+    # whose cycle files changed through its manifest
+    setting = dc.replace(args.settings, overwrite=True)
+    roots = sorted({watch_root(p) for p in args.patterns})
+    find = lambda: watched_files(args, arg_type)
+    # One pool for the whole session, so workers keep their imports and caches
+    pool = process_pool(setting.cores) if setting.cores > 1 else nullcontext()
+    with pool as exec, FileWatcher(find, roots, setting.watch_interval) as watcher:
+        if args.directory:
+            module.main(args, log, exec)
+        log.info(f"Watching {', '.join(roots)} for new input, Ctrl-C to stop")
+        try:
+            while True:
+                ready = watcher.poll()
+                names = sorted({watched_specimen(s, arg_type) for s in ready})
+                if not names:
+                    continue
+                log.info(f"New or modified input for {len(names)} specimen(s)")
+                try:
+                    module.main(InputArgs(names, args.loglevel, setting, []), log, exec)
+                except Exception as e:
+                    log.exception(e)
+        except KeyboardInterrupt:
+            log.info("Stopped watching")
+
+
+def run(
+    program: str,
+    cmd_args: list[str] | None = None,
+    arg_type: Literal["file", "dir"] = "file",
+):
+    args = parse_cmdline_args(cmd_args, arg_type)
+    log = BasicLogger(args.loglevel)
+    args.directory = pending_specimens(args, log, arg_type)
+    try:
+        if args.settings.watch:
+            watch(program, args, log, arg_type)
+        elif args.directory:
+            importlib.import_module(f".{program}", __package__).main(args, log)
+    except Exception as e:
+        log.exception(e)
+    if args.settings.profile:
+        log.summary()
+
+
+def bxpp(cmd_args: list[str] | None = None):
+    run("bxpp", cmd_args)
+
+
+def bxconv(cmd_args: list[str] | None = None):
+    run("bxconv", cmd_args)
+
+
+def sackspp(cmd_args: list[str] | None = None):
+    run("sackspp", cmd_args, arg_type="dir")
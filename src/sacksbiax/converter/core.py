@@ -1,21 +1,24 @@
 from ..datatypes import *
+from ..core.biax import BiaxialKinematics
+from ..core.index import SpecimenIndex, build_specimen_index
 import pandas as pd
 import numpy as np
 
 
-def convert_df_2_bx(raw: pd.DataFrame):
-    coord = np.empty((len(raw["Time_S"]), 2, 4), dtype=float)
+def convert_df_2_bx(raw: pd.DataFrame, dtype: type = np.float64):
+    coord = np.empty((len(raw["Time_S"]), 2, 4), dtype=dtype)
     for i in range(4):
         coord[:, 0, i] = raw[f"X{i+1}"]
         coord[:, 1, i] = raw[f"Y{i+1}"]
+    # time is accumulated by fix_time, so it is always kept in float64
     return RawBiaxFormat(
         raw["Time_S"].to_numpy(dtype=float),
-        raw["XSize_um"].to_numpy(dtype=float),
-        raw["YSize_um"].to_numpy(dtype=float),
-        raw["XForce_mN"].to_numpy(dtype=float),
-        raw["YForce_mN"].to_numpy(dtype=float),
-        raw["Temperature"].to_numpy(dtype=float),
-        raw["ShearAngleDeg"].to_numpy(dtype=float),
+        raw["XSize_um"].to_numpy(dtype=dtype),
+        raw["YSize_um"].to_numpy(dtype=dtype),
+        raw["XForce_mN"].to_numpy(dtype=dtype),
+        raw["YForce_mN"].to_numpy(dtype=dtype),
+        raw["Temperature"].to_numpy(dtype=dtype),
+        raw["ShearAngleDeg"].to_numpy(dtype=dtype),
         coord,
     )
 
@@ -53,23 +56,22 @@ def find_reference_markers_every(
     raw: pd.DataFrame, trys: int = 100
 ) -> tuple[Vec[f64], Vec[f64]]:
     trys = min(trys, len(raw) // 2)
-    for k in range(1, trys):
-        if np.allclose(raw[["lx", "kx", "ky", "ly"]].iloc[k], [1, 0, 0, 1]):
-            return (
-                raw[[f"X{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
-                raw[[f"Y{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
-            )
+    # first row after the initial one with an identity deformation gradient
+    grad = raw[["lx", "kx", "ky", "ly"]].iloc[1:trys].to_numpy(dtype=float)
+    hits = np.flatnonzero(np.isclose(grad, [1, 0, 0, 1]).all(axis=1))
+    k = hits[0] + 1 if len(hits) > 0 else 0
     return (
-        raw[[f"X{i+1}" for i in range(4)]].iloc[0].to_numpy(dtype=float),
-        raw[[f"Y{i+1}" for i in range(4)]].iloc[0].to_numpy(dtype=float),
+        raw[[f"X{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
+        raw[[f"Y{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
     )
 
 
-def find_reference_markers_auto(raw: pd.DataFrame) -> tuple[Vec[f64], Vec[f64]]:
-    preconditioning = raw["SetName"].str.contains("precond", case=False)
-    preload = raw["Cycle"].str.contains("preload", case=False)
-    valid_pts = ~preconditioning & ~preload
-    k = raw[valid_pts].index[0]
+def find_reference_markers_auto(
+    raw: pd.DataFrame, index: SpecimenIndex | None = None
+) -> tuple[Vec[f64], Vec[f64]]:
+    k = (build_specimen_index(raw) if index is None else index).first_valid
+    if k < 0:
+        raise ValueError(f"No data point outside of preconditioning and preload.")
     return (
         raw[[f"X{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
         raw[[f"Y{i+1}" for i in range(4)]].iloc[k].to_numpy(dtype=float),
@@ -81,3 +83,33 @@ def find_reference_markers_first(raw: pd.DataFrame) -> tuple[Vec[f64], Vec[f64]]
         raw[[f"X{i+1}" for i in range(4)]].iloc[0].to_numpy(dtype=float),
         raw[[f"Y{i+1}" for i in range(4)]].iloc[0].to_numpy(dtype=float),
     )
+
+
+class ReferenceState:
+    """
+    Reference configuration of a specimen. AUTO and FIRST do not depend on the
+    protocol, so they are found once and shared; EVERY is searched per protocol.
+    """
+
+    __slots__ = ["option", "shared"]
+    option: ReferenceStateOption
+    shared: BiaxialKinematics | None
+
+    def __init__(
+        self, raw: pd.DataFrame, index: SpecimenIndex, option: ReferenceStateOption
+    ) -> None:
+        self.option = option
+        match option:
+            case ReferenceStateOption.AUTO:
+                markers = find_reference_markers_auto(raw, index)
+                self.shared = BiaxialKinematics(*markers)
+            case ReferenceStateOption.FIRST:
+                markers = find_reference_markers_first(raw)
+                self.shared = BiaxialKinematics(*markers)
+            case ReferenceStateOption.EVERY:
+                self.shared = None
+
+    def kinematics(self, cycle: pd.DataFrame) -> BiaxialKinematics:
+        if self.shared is not None:
+            return self.shared
+        return BiaxialKinematics(*find_reference_markers_every(cycle))
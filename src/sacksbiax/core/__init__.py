@@ -1,4 +1,8 @@
+from .backends import *
 from .biax import *
+from .columnar import *
 from .core import *
+from .index import *
 from .io import *
+from .tensor import *
 from .utils import *
@@ -0,0 +1,139 @@
+__all__ = ["BACKEND"]
+import numba
+import numpy as np
+from .backends import Backend
+from ..datatypes import ComputeBackend, TimeState
+from ..types import *
+
+
+@numba.njit(cache=True)
+def kinematics_kernel(F, J, Finv, C):
+    for m in range(F.shape[0]):
+        a, b = F[m, 0, 0], F[m, 0, 1]
+        c, d = F[m, 1, 0], F[m, 1, 1]
+        det = a * d - b * c
+        J[m] = det
+        Finv[m, 0, 0] = d / det
+        Finv[m, 0, 1] = -(b / det)
+        Finv[m, 1, 0] = -(c / det)
+        Finv[m, 1, 1] = a / det
+        C[m, 0, 0] = a * a + c * c
+        C[m, 0, 1] = a * b + c * d
+        C[m, 1, 0] = b * a + d * c
+        C[m, 1, 1] = b * b + d * d
+
+
+@numba.njit(cache=True)
+def stretches_kernel(F, out):
+    for m in range(F.shape[0]):
+        out[m, 0] = np.sqrt(F[m, 0, 0] * F[m, 0, 0] + F[m, 1, 0] * F[m, 1, 0])
+        out[m, 1] = np.sqrt(F[m, 0, 1] * F[m, 0, 1] + F[m, 1, 1] * F[m, 1, 1])
+
+
+@numba.njit(cache=True)
+def stress_kernel(tFinv, f1, f2, out):
+    # Normal equations of the 4x3 system, tridiagonal, solved by Cramer's rule
+    for m in range(tFinv.shape[0]):
+        a, b = tFinv[m, 0, 0], tFinv[m, 0, 1]
+        c, d = tFinv[m, 1, 0], tFinv[m, 1, 1]
+        p = a * a + c * c
+        r = b * b + d * d
+        x = a * b + c * d
+        u = a * f1[m]
+        v = b * f1[m] + c * f2[m]
+        w = d * f2[m]
+        jac = a * d - b * c
+        # det(AtA) = (p + r) * (p r - x^2) and p r - x^2 = det(tFinv)^2
+        det = (p + r) * jac * jac
+        out[m, 0] = (u * ((p + r) * r - x * x) - x * (v * r - x * w)) / det
+        out[m, 1] = (p * (v * r - x * w) - u * x * r) / det
+        out[m, 2] = (p * ((p + r) * w - v * x) - x * x * w + u * x * x) / det
+
+
+@numba.njit(cache=True)
+def energy_kernel(C, S, dE, dH, dW, W):
+    n = C.shape[0]
+    for m in range(n):
+        for i in range(2):
+            for j in range(2):
+                dE[m, i, j] = C[m, i, j] - (C[m - 1, i, j] if m > 0 else 0.0)
+    total = 0.0
+    for m in range(n):
+        for i in range(2):
+            for j in range(2):
+                h = dE[m + 1, i, j] * S[m, i, j] if m + 1 < n else 0.0
+                if m > 0:
+                    h = h + dE[m, i, j] * S[m, i, j]
+                dH[m, i, j] = h
+        dW[m] = dH[m, 0, 0] + dH[m, 0, 1] + dH[m, 1, 0] + dH[m, 1, 1]
+        total = total + dW[m]
+        W[m] = total
+
+
+@numba.njit(cache=True)
+def fix_time_kernel(time, last, step, has_step, out):
+    # Same forward fill of the last valid step as the numpy version
+    acc = 0.0
+    for m in range(time.shape[0]):
+        dt = time[m] - last
+        last = time[m]
+        if dt < 0.0 and (has_step or m > 0):
+            dt = step
+        step = dt
+        has_step = True
+        acc = acc + dt
+        out[m] = acc
+    return step
+
+
+def kinematics(F: MatV[f64]) -> tuple[Vec[f64], MatV[f64], MatV[f64]]:
+    J = np.empty(len(F), dtype=F.dtype)
+    Finv, C = np.empty_like(F), np.empty_like(F)
+    kinematics_kernel(F, J, Finv, C)
+    return J, Finv, C
+
+
+def stretches(F: MatV[f64]) -> Mat[f64]:
+    out = np.empty((len(F), 2), dtype=F.dtype)
+    stretches_kernel(F, out)
+    return out
+
+
+def stress(tFinv: MatV[f64], f1: Vec[f64], f2: Vec[f64]) -> Mat[f64]:
+    out = np.empty((len(tFinv), 3), dtype=tFinv.dtype)
+    stress_kernel(tFinv, np.asarray(f1, tFinv.dtype), np.asarray(f2, tFinv.dtype), out)
+    return out
+
+
+def energy(
+    C: MatV[f64], S: MatV[f64]
+) -> tuple[MatV[f64], MatV[f64], Vec[f64], Vec[f64]]:
+    dE, dH = np.empty_like(C), np.empty_like(C)
+    # W is accumulated in float64 whatever the precision of the increments
+    dW, W = np.empty(len(C), dtype=C.dtype), np.empty(len(C), dtype=np.float64)
+    energy_kernel(C, S, dE, dH, dW, W)
+    return dE, dH, dW, W
+
+
+def fix_time(time: Vec[f64], state: TimeState) -> Vec[f64]:
+    if len(time) == 0:
+        return np.zeros(0, dtype=float)
+    time = np.asarray(time, dtype=float)
+    res = np.empty(len(time), dtype=float)
+    has_step = state.step is not None
+    step = fix_time_kernel(
+        time, state.last, state.step if has_step else 0.0, has_step, res
+    )
+    res += state.total
+    state.last, state.step, state.total = time[-1], step, res[-1]
+    return res
+
+
+BACKEND = Backend(
+    ComputeBackend.NUMBA,
+    kinematics,
+    stretches,
+    stress,
+    energy,
+    fix_time,
+)
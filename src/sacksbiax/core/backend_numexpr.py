@@ -0,0 +1,82 @@
+__all__ = ["BACKEND"]
+import numexpr as ne
+import numpy as np
+from .backends import Backend
+from .backend_numpy import fix_time
+from ..datatypes import ComputeBackend
+from ..types import *
+
+
+def components(T: MatV[f64]) -> dict[str, Vec[f64]]:
+    return {"a": T[:, 0, 0], "b": T[:, 0, 1], "c": T[:, 1, 0], "d": T[:, 1, 1]}
+
+
+def kinematics(F: MatV[f64]) -> tuple[Vec[f64], MatV[f64], MatV[f64]]:
+    f = components(F)
+    J = ne.evaluate("a * d - b * c", f)
+    Finv, C = np.empty_like(F), np.empty_like(F)
+    f["J"] = J
+    ne.evaluate("d / J", f, out=Finv[:, 0, 0])
+    ne.evaluate("-(b / J)", f, out=Finv[:, 0, 1])
+    ne.evaluate("-(c / J)", f, out=Finv[:, 1, 0])
+    ne.evaluate("a / J", f, out=Finv[:, 1, 1])
+    ne.evaluate("a * a + c * c", f, out=C[:, 0, 0])
+    ne.evaluate("a * b + c * d", f, out=C[:, 0, 1])
+    ne.evaluate("b * a + d * c", f, out=C[:, 1, 0])
+    ne.evaluate("b * b + d * d", f, out=C[:, 1, 1])
+    return J, Finv, C
+
+
+def stretches(F: MatV[f64]) -> Mat[f64]:
+    f = components(F)
+    out = np.empty((len(F), 2), dtype=F.dtype)
+    ne.evaluate("sqrt(a * a + c * c)", f, out=out[:, 0])
+    ne.evaluate("sqrt(b * b + d * d)", f, out=out[:, 1])
+    return out
+
+
+def stress(tFinv: MatV[f64], f1: Vec[f64], f2: Vec[f64]) -> Mat[f64]:
+    # Same closed form solve of the tridiagonal normal equations as the numba backend
+    t = components(tFinv)
+    t["f1"], t["f2"] = np.asarray(f1, tFinv.dtype), np.asarray(f2, tFinv.dtype)
+    t["p"] = ne.evaluate("a * a + c * c", t)
+    t["r"] = ne.evaluate("b * b + d * d", t)
+    t["x"] = ne.evaluate("a * b + c * d", t)
+    t["u"] = ne.evaluate("a * f1", t)
+    t["v"] = ne.evaluate("b * f1 + c * f2", t)
+    t["w"] = ne.evaluate("d * f2", t)
+    t["det"] = ne.evaluate("(p + r) * (a * d - b * c) * (a * d - b * c)", t)
+    out = np.empty((len(tFinv), 3), dtype=tFinv.dtype)
+    ne.evaluate(
+        "(u * ((p + r) * r - x * x) - x * (v * r - x * w)) / det", t, out=out[:, 0]
+    )
+    ne.evaluate("(p * (v * r - x * w) - u * x * r) / det", t, out=out[:, 1])
+    ne.evaluate(
+        "(p * ((p + r) * w - v * x) - x * x * w + u * x * x) / det", t, out=out[:, 2]
+    )
+    return out
+
+
+def energy(
+    C: MatV[f64], S: MatV[f64]
+) -> tuple[MatV[f64], MatV[f64], Vec[f64], Vec[f64]]:
+    dE: MatV[f64] = np.diff(C, axis=0, prepend=np.zeros((1, 2, 2), dtype=C.dtype))
+    dH = np.zeros_like(dE)
+    if len(C) > 1:
+        inner = {"e0": dE[1:-1], "e1": dE[2:], "s": S[1:-1]}
+        ne.evaluate("e1 * s + e0 * s", inner, out=dH[1:-1])
+        ne.evaluate("e * s", {"e": dE[1], "s": S[0]}, out=dH[0])
+        ne.evaluate("e * s", {"e": dE[-1], "s": S[-1]}, out=dH[-1])
+    dW = ne.evaluate("a + b + c + d", components(dH))
+    return dE, dH, dW, np.add.accumulate(dW, dtype=np.float64)
+
+
+# numexpr has no scans, the time fix keeps its numpy forward fill
+BACKEND = Backend(
+    ComputeBackend.NUMEXPR,
+    kinematics,
+    stretches,
+    stress,
+    energy,
+    fix_time,
+)
@@ -0,0 +1,52 @@
+__all__ = ["BACKEND"]
+import numpy as np
+from .backends import Backend
+from .biax import stress_homogenous_batched
+from .tensor import colnorm2, det2, inv2, mul2_tn
+from ..datatypes import ComputeBackend, TimeState
+from ..types import *
+
+
+def kinematics(F: MatV[f64]) -> tuple[Vec[f64], MatV[f64], MatV[f64]]:
+    J = det2(F)
+    return J, inv2(F, J), mul2_tn(F, F)
+
+
+def energy(
+    C: MatV[f64], S: MatV[f64]
+) -> tuple[MatV[f64], MatV[f64], Vec[f64], Vec[f64]]:
+    dE: MatV[f64] = np.diff(C, axis=0, prepend=np.zeros((1, 2, 2), dtype=C.dtype))
+    dH = np.zeros_like(dE)
+    dH[:-1] = dE[1:] * S[:-1]
+    dH[1:] = dH[1:] + dE[1:] * S[1:]
+    dW = dH[:, 0, 0] + dH[:, 0, 1] + dH[:, 1, 0] + dH[:, 1, 1]
+    # The work is accumulated in float64 whatever the precision of the increments
+    psi = np.add.accumulate(dW, dtype=np.float64)
+    return dE, dH, dW, psi
+
+
+def fix_time(time: Vec[f64], state: TimeState) -> Vec[f64]:
+    if len(time) == 0:
+        return np.zeros(0, dtype=float)
+    # Negative steps take the last valid step, i.e. a forward fill of the indices
+    dt = np.diff(time, prepend=[state.last])
+    valid = ~(dt < 0.0)
+    if state.step is None:
+        valid[:1] = True
+    last = np.where(valid, np.arange(len(dt)), -1)
+    np.maximum.accumulate(last, out=last)
+    dt = dt[last]
+    dt[last < 0] = state.step
+    res = state.total + np.add.accumulate(dt)
+    state.last, state.step, state.total = time[-1], dt[-1], res[-1]
+    return res
+
+
+BACKEND = Backend(
+    ComputeBackend.NUMPY,
+    kinematics,
+    colnorm2,
+    stress_homogenous_batched,
+    energy,
+    fix_time,
+)
@@ -0,0 +1,46 @@
+__all__ = ["BACKEND_MODULES", "Backend", "get_backend"]
+import dataclasses as dc
+import importlib
+from functools import cache
+from typing import Callable, Final
+from ..datatypes import ComputeBackend, TimeState
+from ..types import *
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Backend:
+    """
+    The hot kernels of the pipeline for one compute library. Every backend must
+    give the numpy results up to round off, see tests/test_backends.py.
+    """
+
+    name: ComputeBackend
+    # F -> J, F^-1, C
+    kinematics: Callable[[MatV[f64]], tuple[Vec[f64], MatV[f64], MatV[f64]]]
+    # F -> stretch of the x and y directions, (N, 2)
+    stretches: Callable[[MatV[f64]], Mat[f64]]
+    # F^-T, f1, f2 -> sxx, sxy, syy of the homogeneous stress, (N, 3)
+    stress: Callable[[MatV[f64], Vec[f64], Vec[f64]], Mat[f64]]
+    # C, S -> dE, dH, dW, W
+    energy: Callable[
+        [MatV[f64], MatV[f64]], tuple[MatV[f64], MatV[f64], Vec[f64], Vec[f64]]
+    ]
+    fix_time: Callable[[Vec[f64], TimeState], Vec[f64]]
+
+
+# Imported on first use, so numba and numexpr stay optional
+BACKEND_MODULES: Final[dict[ComputeBackend, str]] = {
+    ComputeBackend.NUMPY: ".backend_numpy",
+    ComputeBackend.NUMBA: ".backend_numba",
+    ComputeBackend.NUMEXPR: ".backend_numexpr",
+}
+
+
+@cache
+def get_backend(name: ComputeBackend = ComputeBackend.NUMPY) -> Backend:
+    "Falls back to numpy when the package of the requested backend is missing"
+    try:
+        module = importlib.import_module(BACKEND_MODULES[name], __package__)
+    except ImportError:
+        return get_backend(ComputeBackend.NUMPY)
+    return module.BACKEND
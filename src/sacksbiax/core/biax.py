@@ -1,6 +1,6 @@
-from typing import Final
+from concurrent import futures
+from typing import Callable, Final, Sequence
 import numpy as np
-from scipy.linalg import lstsq
 from ..types import *
 
 
@@ -11,7 +11,6 @@ gradv: Mat[f64] = 0.25 * np.array([[-1, -1, 1, 1], [-1, 1, -1, 1]], dtype=float)
 
 EX: Final[Vec[f64]] = np.array([1, 0], dtype=float)
 EY: Final[Vec[f64]] = np.array([0, 1], dtype=float)
-A: Final[Mat[f64]] = np.zeros((4, 3), dtype=float)
 # dfdr: Vec[f64] = 0.25 * np.array([1, -1, -1, 1], dtype=float)
 # dfds: Vec[f64] = 0.25 * np.array([1, 1, -1, -1], dtype=float)
 # gradv: Mat[f64] = 0.25 * np.array([[1, -1, -1, 1], [1, 1, -1, -1]], dtype=float)
@@ -34,12 +33,72 @@ class BiaxialKinematics:
         return def_grad
 
 
+def fused_deformation_gradient(
+    refs: Sequence[BiaxialKinematics], coord: MatV[f64]
+) -> list[MatV[f64]]:
+    "Marker gradient is contracted once and shared by every reference state"
+    grad = np.einsum("mij,kj->mik", coord, gradv.astype(coord.dtype, copy=False))
+    ref_tensor = np.stack([r.ref_tensor for r in refs]).astype(coord.dtype, copy=False)
+    return list(np.einsum("mij,rjk->rmik", grad, ref_tensor))
+
+
 def stress_homogenous(tFinv: Mat[f64], f1: float, f2: float) -> Vec[f64]:
+    # Reference solve for a single row, the pipeline only uses the batched ones
+    from scipy.linalg import lstsq
+
     n1 = EX @ tFinv
     n2 = EY @ tFinv
+    A = np.zeros((4, 3), dtype=float)
     A[0, :2] = n1
     A[1, 1:] = n1
     A[2, :2] = n2
     A[3, 1:] = n2
     b = np.array([f1, 0, 0, f2], dtype=float)
     return lstsq(A, b, lapack_driver="gelsy", check_finite=False)[0]
+
+
+def stress_homogenous_batched(tFinv: MatV[f64], f1: Vec[f64], f2: Vec[f64]) -> Mat[f64]:
+    "Normal equations of stress_homogenous for all rows, solved as one (N,3,3) batch"
+    a, b = tFinv[:, 0, 0], tFinv[:, 0, 1]
+    c, d = tFinv[:, 1, 0], tFinv[:, 1, 1]
+    cross = a * b + c * d
+    AtA = np.zeros((len(tFinv), 3, 3), dtype=tFinv.dtype)
+    AtA[:, 0, 0] = a * a + c * c
+    AtA[:, 0, 1] = cross
+    AtA[:, 1, 0] = cross
+    AtA[:, 1, 1] = a * a + b * b + c * c + d * d
+    AtA[:, 1, 2] = cross
+    AtA[:, 2, 1] = cross
+    AtA[:, 2, 2] = b * b + d * d
+    Atb = np.empty((len(tFinv), 3, 1), dtype=tFinv.dtype)
+    Atb[:, 0, 0] = a * f1
+    Atb[:, 1, 0] = b * f1 + c * f2
+    Atb[:, 2, 0] = d * f2
+    return np.linalg.solve(AtA, Atb)[:, :, 0]
+
+
+def stress_homogenous_threaded(
+    tFinv: MatV[f64],
+    f1: Vec[f64],
+    f2: Vec[f64],
+    threads: int = 1,
+    chunk: int = 16384,
+    solve: Callable[
+        [MatV[f64], Vec[f64], Vec[f64]], Mat[f64]
+    ] = stress_homogenous_batched,
+) -> Mat[f64]:
+    "Split the batched solve into chunks solved on a thread pool"
+    n_rows = len(tFinv)
+    if threads < 2 or n_rows <= chunk:
+        return solve(tFinv, f1, f2)
+    step = max(chunk, -(-n_rows // threads))
+    res = np.empty((n_rows, 3), dtype=tFinv.dtype)
+
+    def solve_chunk(i: int, j: int) -> None:
+        res[i:j] = solve(tFinv[i:j], f1[i:j], f2[i:j])
+
+    with futures.ThreadPoolExecutor(threads) as pool:
+        jobs = [pool.submit(solve_chunk, i, i + step) for i in range(0, n_rows, step)]
+        for job in jobs:
+            job.result()
+    return res
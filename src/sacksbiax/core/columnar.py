@@ -0,0 +1,195 @@
+__all__ = ["ColumnarFrame", "FrameBuilder", "concat_frames", "factorize_text"]
+import dataclasses as dc
+from typing import Any, Container
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from ..types import *
+
+
+def factorize_text(serie: pd.Series) -> tuple[Vec[i32], pd.Index]:
+    # Categoricals already carry their codes, anything else is encoded here
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(np.int32), serie.cat.categories
+    codes, uniques = pd.factorize(serie)
+    return codes.astype(np.int32), uniques
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate like pd.concat but keep categorical columns categorical, pandas
+    falls back to object strings as soon as two frames have different categories.
+    """
+    coded = [
+        k
+        for k in frames[0].columns
+        if all(isinstance(f[k].dtype, pd.CategoricalDtype) for f in frames)
+    ]
+    df = pd.concat([f.drop(columns=coded) for f in frames], ignore_index=True)
+    for k in sorted(coded, key=frames[0].columns.get_loc):
+        cat = union_categoricals([f[k] for f in frames])
+        df.insert(frames[0].columns.get_loc(k), k, cat)
+    return df
+
+
+def block_dtype(dtype: Any) -> str:
+    # Extension dtypes are kept in float64 and restored from the saved dtypes
+    return dtype.name if isinstance(dtype, np.dtype) else "float64"
+
+
+@dc.dataclass(slots=True)
+class ColumnarFrame:
+    """
+    Numeric columns of a DataFrame stacked in one (n_cols, n_rows) block per dtype,
+    text columns stored as integer codes into a table of categories.
+    """
+
+    columns: list[str]
+    numeric: dict[str, list[str]]
+    coded: list[str]
+    values: dict[str, Mat[f64]]
+    codes: Mat[i32]
+    categories: list[list[str]]
+
+    @staticmethod
+    def layout(df: pd.DataFrame) -> tuple[dict[str, list[str]], list[str]]:
+        numeric: dict[str, list[str]] = dict()
+        coded: list[str] = list()
+        for k in df.columns:
+            if pd.api.types.is_numeric_dtype(df[k]):
+                numeric.setdefault(block_dtype(df[k].dtype), []).append(k)
+            else:
+                coded.append(k)
+        return numeric, coded
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        values: dict[str, Mat[f64]] | None = None,
+        codes: Mat[i32] | None = None,
+    ) -> "ColumnarFrame":
+        numeric, coded = cls.layout(df)
+        if values is None:
+            values = {
+                t: np.empty((len(names), len(df)), dtype=t)
+                for t, names in numeric.items()
+            }
+        if codes is None:
+            codes = np.empty((len(coded), len(df)), dtype=np.int32)
+        for t, names in numeric.items():
+            for j, k in enumerate(names):
+                values[t][j] = df[k].to_numpy(dtype=t)
+        categories: list[list[str]] = list()
+        for j, k in enumerate(coded):
+            c, u = factorize_text(df[k])
+            codes[j] = c
+            categories.append([str(s) for s in u])
+        return cls(list(df.columns), numeric, coded, values, codes, categories)
+
+    def to_frame(self) -> pd.DataFrame:
+        # The blocks are wrapped without copying; each column is a row of its block
+        cols: dict[str, Any] = {
+            k: self.values[t][j]
+            for t, names in self.numeric.items()
+            for j, k in enumerate(names)
+        }
+        for j, k in enumerate(self.coded):
+            cols[k] = pd.Categorical.from_codes(self.codes[j], self.categories[j])
+        return pd.DataFrame({k: cols[k] for k in self.columns}, copy=False)
+
+    def save_npz(self, name: str, **meta: str) -> None:
+        # Written through a handle, np.savez would otherwise append .npz to name
+        blocks = dict()
+        for t, names in self.numeric.items():
+            blocks[f"numeric_{t}"] = np.array(names, dtype=str)
+            blocks[f"values_{t}"] = self.values[t]
+        cats = {
+            f"categories_{j}": np.array(c, dtype=str)
+            for j, c in enumerate(self.categories)
+        }
+        with open(name, "wb") as f:
+            np.savez(
+                f,
+                columns=np.array(self.columns, dtype=str),
+                coded=np.array(self.coded, dtype=str),
+                codes=self.codes,
+                **blocks,
+                **cats,
+                **{f"meta_{k}": np.array(v, dtype=str) for k, v in meta.items()},
+            )
+
+    @classmethod
+    def load_npz(cls, name: str) -> tuple["ColumnarFrame", dict[str, str]]:
+        with np.load(name, allow_pickle=False) as npz:
+            coded = npz["coded"].tolist()
+            types = [k[8:] for k in npz.files if k.startswith("numeric_")]
+            col = cls(
+                npz["columns"].tolist(),
+                {t: npz[f"numeric_{t}"].tolist() for t in types},
+                coded,
+                {t: npz[f"values_{t}"] for t in types},
+                npz["codes"],
+                [npz[f"categories_{j}"].tolist() for j in range(len(coded))],
+            )
+            meta = {k[5:]: str(npz[k]) for k in npz.files if k.startswith("meta_")}
+        return col, meta
+
+
+class FrameBuilder:
+    """
+    Preallocated output columns in the field order of a flat dataclass schema.
+    Float fields share one F-ordered block and integer fields another, so every
+    column is a strided view that is filled in place and wrapped without copying.
+    With a float32 dtype, integers are int32 and the wide fields get a float64
+    block of their own.
+    """
+
+    __slots__ = ["names", "floats", "wide", "ints", "columns"]
+    names: list[str]
+    floats: Mat[f64]
+    wide: Mat[f64]
+    ints: Mat[i32]
+    columns: dict[str, Any]
+
+    def __init__(
+        self,
+        schema: type,
+        n_rows: int,
+        ints: Container[str] = (),
+        dtype: type = np.float64,
+        wide: Container[str] = (),
+    ) -> None:
+        fields = dc.fields(schema)
+        self.names = [f.name for f in fields]
+        text = [f.name for f in fields if f.type == Vec[char]]
+        whole = [f.name for f in fields if f.type == Vec[i32] or f.name in ints]
+        real = [k for k in self.names if k not in text and k not in whole]
+        compact = np.dtype(dtype) == np.float32
+        double = [k for k in real if compact and k in wide]
+        real = [k for k in real if k not in double]
+        self.floats = np.empty((n_rows, len(real)), dtype=dtype, order="F")
+        self.wide = np.empty((n_rows, len(double)), dtype=np.float64, order="F")
+        int_type = np.int32 if compact else np.int64
+        self.ints = np.empty((n_rows, len(whole)), dtype=int_type, order="F")
+        self.columns = {k: None for k in text}
+        self.columns.update({k: self.floats[:, j] for j, k in enumerate(real)})
+        self.columns.update({k: self.wide[:, j] for j, k in enumerate(double)})
+        self.columns.update({k: self.ints[:, j] for j, k in enumerate(whole)})
+
+    def __getitem__(self, name: str) -> Any:
+        return self.columns[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        col = self.columns[name]
+        if isinstance(col, np.ndarray):
+            col[:] = value
+        elif np.ndim(value) == 0:
+            codes = np.zeros(len(self.floats), dtype=np.int8)
+            self.columns[name] = pd.Categorical.from_codes(codes, [value])
+        else:
+            # Series are unwrapped so their index cannot misalign the frame
+            self.columns[name] = pd.Categorical(value)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({k: self.columns[k] for k in self.names}, copy=False)
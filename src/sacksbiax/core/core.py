@@ -1,6 +1,13 @@
-import re
+from .backends import get_backend
+from .columnar import FrameBuilder
+from .index import SpecimenIndex, build_specimen_index
+from .tensor import coldot2, colnorm2, mul2, mul2_nt
 from .utils import RVE_analysis
-from .biax import BiaxialKinematics, stress_homogenous
+from .biax import (
+    BiaxialKinematics,
+    fused_deformation_gradient,
+    stress_homogenous_threaded,
+)
 from ..datatypes import SACKS_NODE_ORDER, CycleState, Kinematics, Kinetics
 from ..parsers import *
 from ..types import *
@@ -8,6 +15,16 @@ from ..datatypes import *
 import numpy as np
 import pandas as pd
 
+# Exported as truncated integers, like the instrument writes them
+INT_SIZE_FIELDS: Final[set[str]] = {
+    "XSize_um",
+    "YSize_um",
+    "XDisplacement_um",
+    "YDisplacement_um",
+}
+# Accumulated over the whole export, kept in float64 in every precision
+WIDE_FIELDS: Final[set[str]] = {"Time_S", "W"}
+
 
 def import_ref_markers(p: str) -> tuple[Vec[f64], Vec[f64]]:
     ref_markers = np.loadtxt(p)
@@ -17,136 +34,135 @@ def import_ref_markers(p: str) -> tuple[Vec[f64], Vec[f64]]:
     )
 
 
-TEMP = re.compile(r"(\d+)-.+")
-
-
-def match_n_s(vals: list[str] | Vec[char]):
-    for v in vals:
-        yield TEMP.match(v)
+def sort_data_cycle_types(
+    raw: pd.DataFrame, index: SpecimenIndex | None = None
+) -> CycleTypes:
+    index = build_specimen_index(raw) if index is None else index
+    if len(index.protocols) == 1:
+        return index.cycle_types(next(iter(index.protocols)))
+    tags = CycleTypes(
+        *(np.zeros(index.n_rows, dtype=int) for _ in dc.fields(CycleTypes))
+    )
+    for name, p in index.protocols.items():
+        part = index.cycle_types(name)
+        for f in dc.fields(CycleTypes):
+            getattr(tags, f.name)[p.rows] = getattr(part, f.name)
+    return tags
 
 
-def find_last_cycle_name(data: pd.DataFrame):
-    cycles = {
-        int(g.group(1)): g.group(0) for g in match_n_s(data["Cycle"].unique()) if g
-    }
-    return cycles[max(cycles.keys())]
+def kinematics_from_deformation_gradient(
+    DefGrad: MatV[f64], backend: ComputeBackend = ComputeBackend.NUMPY
+) -> Kinematics:
+    jacobian, invGrad, rightCG = get_backend(backend).kinematics(DefGrad)
+    return Kinematics(DefGrad, invGrad, rightCG, jacobian)
 
 
-def find_last_cycle(raw: pd.DataFrame, setname: str):
-    this_set = raw["SetName"] == setname
-    return (this_set) & (raw["Cycle"] == find_last_cycle_name(raw[this_set]))
+def compute_kinematics_fused(
+    refs: list[BiaxialKinematics],
+    bx: RawBiaxFormat,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
+) -> list[Kinematics]:
+    return [
+        kinematics_from_deformation_gradient(F, backend)
+        for F in fused_deformation_gradient(refs, bx.coord)
+    ]
 
 
-def sort_data_cycle_types(raw: pd.DataFrame) -> CycleTypes:
-    setnames = raw["SetName"].unique()
-    precond = raw["SetName"].str.contains("precond", case=False)
-    preload = raw["Cycle"].str.contains("preload", case=False)
-    stretch = raw["Cycle"].str.contains("stretch", case=False)
-    recover = raw["Cycle"].str.contains("recover", case=False)
-    equibx = raw["SetName"].str.contains("equib", case=False) & ~preload
-    relax = raw["SetName"].str.contains("relax", case=False) & ~preload
-    creep = raw["SetName"].str.contains("creep", case=False) & ~preload
-    last_cycle = find_last_cycle(raw, setnames[0])
-    for s in setnames[1:]:
-        last_cycle = last_cycle | find_last_cycle(raw, s)
-    last_eb = raw["SetName"] == (equibx.unique()[-1])
-    plotting = ~precond & ~preload & last_cycle
-    fitting = plotting & ~(equibx ^ last_eb)
-    return CycleTypes(
-        precond.to_numpy(int),
-        equibx.to_numpy(int),
-        relax.to_numpy(int),
-        creep.to_numpy(int),
-        preload.to_numpy(int),
-        stretch.to_numpy(int),
-        recover.to_numpy(int),
-        last_cycle.to_numpy(int),
-        last_eb.to_numpy(int),
-        plotting.to_numpy(int),
-        fitting.to_numpy(int),
-    )
+def compute_kinematics(
+    def_grad: BiaxialKinematics,
+    bx: RawBiaxFormat,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
+) -> Kinematics:
+    return compute_kinematics_fused([def_grad], bx, backend)[0]
 
 
-def compute_kinematics(def_grad: BiaxialKinematics, bx: RawBiaxFormat) -> Kinematics:
-    DefGrad = def_grad.deformation_gradient(bx.coord)
-    jacobian = DefGrad[:, 0, 0] * DefGrad[:, 1, 1] - DefGrad[:, 0, 1] * DefGrad[:, 1, 0]
-    invGrad = np.empty_like(DefGrad, dtype=float)
-    invGrad[:, 0, 0] = DefGrad[:, 1, 1] / jacobian
-    invGrad[:, 0, 1] = -DefGrad[:, 0, 1] / jacobian
-    invGrad[:, 1, 0] = -DefGrad[:, 1, 0] / jacobian
-    invGrad[:, 1, 1] = DefGrad[:, 0, 0] / jacobian
-    rightCG = np.einsum("mji,mjk->mik", DefGrad, DefGrad)
-    return Kinematics(DefGrad, invGrad, rightCG, jacobian)
+def compute_kinematics_with_origin(
+    def_grad: BiaxialKinematics,
+    spec: SpecimenInfo,
+    bx: RawBiaxFormat,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
+) -> tuple[Kinematics, Kinematics]:
+    origin = BiaxialKinematics(spec.x_iff, spec.y_iff)
+    kin, kin_origin = compute_kinematics_fused([def_grad, origin], bx, backend)
+    return kin, kin_origin
 
 
 def compute_kinetics_cauchy(
-    spec: SpecimenInfo, kin: Kinematics, bx: RawBiaxFormat
+    spec: SpecimenInfo,
+    kin: Kinematics,
+    origin: Kinematics,
+    bx: RawBiaxFormat,
+    threads: int = 1,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
 ) -> Kinetics:
     # n_rows = keys.End[-1]
-    Lx, Ly, Lz, invGrad_origin = RVE_analysis(spec, bx)
+    Lx, Ly, Lz, invGrad_origin = RVE_analysis(spec, origin, backend)
     T1 = bx.XForce_mN / Ly / Lz
     T2 = bx.YForce_mN / Lx / Lz
-    vVals = np.empty((len(T1), 3), dtype=float)
-    for k, (f, i, j) in enumerate(zip(invGrad_origin, T1, T2)):
-        vVals[k] = stress_homogenous(f, i, j)
-    cauchy = np.empty_like(kin.F, dtype=float)
+    solve = get_backend(backend).stress
+    vVals = stress_homogenous_threaded(invGrad_origin, T1, T2, threads, solve=solve)
+    cauchy = np.empty_like(kin.F)
     cauchy[:, 0, 0] = vVals[:, 0]
     cauchy[:, 0, 1] = vVals[:, 1]
     cauchy[:, 1, 0] = vVals[:, 1]
     cauchy[:, 1, 1] = vVals[:, 2]
-    pk1 = np.einsum("mij,mkj->mik", cauchy, kin.Finv)
-    pk2 = np.einsum("mij,mjk->mik", kin.Finv, pk1)
+    pk1 = mul2_nt(cauchy, kin.Finv)
+    pk2 = mul2(kin.Finv, pk1)
     return Kinetics(cauchy, pk1, pk2, Lz)
 
 
 def compute_kinetics_pk1(
-    spec: SpecimenInfo, kin: Kinematics, bx: RawBiaxFormat
+    spec: SpecimenInfo,
+    kin: Kinematics,
+    origin: Kinematics,
+    bx: RawBiaxFormat,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
 ) -> Kinetics:
     # n_rows = keys.End[-1]
-    _, _, Lz, _ = RVE_analysis(spec, bx)
-    pk1 = np.zeros_like(kin.F, dtype=float)
+    _, _, Lz, _ = RVE_analysis(spec, origin, backend)
+    pk1 = np.zeros_like(kin.F)
     pk1[:, 0, 0] = bx.XForce_mN / spec.dim[1] / spec.dim[2]
     pk1[:, 1, 1] = bx.YForce_mN / spec.dim[0] / spec.dim[2]
-    cauchy = np.einsum("mij,mkj->mik", pk1, kin.F)
-    pk2 = np.einsum("mij,mjk->mik", kin.Finv, pk1)
+    cauchy = mul2_nt(pk1, kin.F)
+    pk2 = mul2(kin.Finv, pk1)
     return Kinetics(cauchy, pk1, pk2, Lz)
 
 
 def compute_kinetics_nominal(
-    spec: SpecimenInfo, kin: Kinematics, bx: RawBiaxFormat
+    spec: SpecimenInfo,
+    kin: Kinematics,
+    origin: Kinematics,
+    bx: RawBiaxFormat,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
 ) -> Kinetics:
     # n_rows = keys.End[-1]
-    _, _, Lz, _ = RVE_analysis(spec, bx)
-    nominal = np.zeros_like(kin.F, dtype=float)
+    _, _, Lz, _ = RVE_analysis(spec, origin, backend)
+    nominal = np.zeros_like(kin.F)
     nominal[:, 0, 0] = bx.XForce_mN / spec.dim[1] / spec.dim[2]
     nominal[:, 1, 1] = bx.YForce_mN / spec.dim[0] / spec.dim[2]
-    cauchy = np.einsum("mij,mjk->mik", kin.F, nominal)
+    cauchy = mul2(kin.F, nominal)
     pk1 = nominal.swapaxes(1, 2)
-    pk2 = np.einsum("mij,mjk->mik", kin.Finv, pk1)
+    pk2 = mul2(kin.Finv, pk1)
     return Kinetics(cauchy, pk1, pk2, Lz)
 
 
-def compute_energy(kin: Kinematics, sig: Kinetics) -> Energy:
-    dE: MatV[f64] = np.diff(kin.C, axis=0, prepend=[[[0, 0], [0, 0]]])
-    dH = np.zeros_like(dE)
-    dH[:-1] = dE[1:] * sig.S[:-1]
-    dH[1:] = dH[1:] + dE[1:] * sig.S[1:]
-    dW = dH[:, 0, 0] + dH[:, 0, 1] + dH[:, 1, 0] + dH[:, 1, 1]
-    psi = np.add.accumulate(dW)
-    return Energy(dE, dH, dW, psi)
+def compute_energy(
+    kin: Kinematics, sig: Kinetics, backend: ComputeBackend = ComputeBackend.NUMPY
+) -> Energy:
+    return Energy(*get_backend(backend).energy(kin.C, sig.S))
 
 
 def compute_shear_angle(kin: Kinematics) -> Vec[f64]:
-    a = kin.F @ [1.0, 0.0]
-    b = kin.F @ [0.0, 1.0]
-    abs_a = np.linalg.norm(a, axis=1)
-    abs_b = np.linalg.norm(b, axis=1)
-    return 180.0 * (
-        0.5 - np.arccos(np.einsum("mi, mi -> m", a, b) / abs_a / abs_b) / np.pi
-    )
+    # angle between the deformed x and y directions, i.e. the columns of F
+    norms = colnorm2(kin.F)
+    angle = coldot2(kin.F)
+    angle /= norms[:, 0]
+    angle /= norms[:, 1]
+    np.arccos(angle, out=angle)
+    return 180.0 * (0.5 - angle / np.pi)
 
 
-def parse_cycle(kin: Kinematics, tag: str | int) -> list[str]:
+def parse_cycle(kin: Kinematics, tag: str | int) -> pd.Categorical:
     max_index = np.argmax(kin.J) + 1
     min_index = np.argmin(kin.J)
     if min_index > 20:
@@ -155,15 +171,18 @@ def parse_cycle(kin: Kinematics, tag: str | int) -> list[str]:
     label[:min_index] = CycleState.Preload
     label[min_index:max_index] = CycleState.Stretch
     label[max_index:] = CycleState.Recover
-    return [f"{tag}-{CycleState(i).name}" for i in label]
+    return pd.Categorical.from_codes(label, [f"{tag}-{s.name}" for s in CycleState])
 
 
-def fix_time(time: Vec[f64]) -> Vec[f64]:
-    dt = np.diff(time, prepend=[0.0])
-    for i in range(1, len(dt)):
-        if dt[i] < 0.0:
-            dt[i] = dt[i - 1]
-    return np.add.accumulate(dt)
+def fix_time(
+    time: Vec[f64],
+    state: TimeState | None = None,
+    backend: ComputeBackend = ComputeBackend.NUMPY,
+) -> Vec[f64]:
+    # state carries the clock across calls, so chunks can be fixed one at a time
+    if state is None:
+        state = TimeState()
+    return get_backend(backend).fix_time(time, state)
 
 
 def export_kamenskiy_format(
@@ -171,16 +190,22 @@ def export_kamenskiy_format(
     kin: Kinematics,
     sig: Kinetics,
     shear: Vec[f64],
+    set_name: str,
+    cycle: Vec[char],
 ) -> pd.DataFrame:
-    df = dict()
+    df = FrameBuilder(
+        KamenskiyFormat, len(data.time), INT_SIZE_FIELDS, kin.F.dtype, WIDE_FIELDS
+    )
+    df["SetName"] = set_name
+    df["Cycle"] = cycle
     df["Time_S"] = data.time
-    df["XSize_um"] = data.XSize_um.astype(int)
-    df["YSize_um"] = data.YSize_um.astype(int)
+    df["XSize_um"] = data.XSize_um
+    df["YSize_um"] = data.YSize_um
     df["XForce_mN"] = data.XForce_mN
     df["YForce_mN"] = data.YForce_mN
     df["Temperature"] = data.Temperature
-    df["XDisplacement_um"] = df["XSize_um"] - df["XSize_um"][0]
-    df["YDisplacement_um"] = df["YSize_um"] - df["YSize_um"][0]
+    np.subtract(df["XSize_um"], df["XSize_um"][0], out=df["XDisplacement_um"])
+    np.subtract(df["YSize_um"], df["YSize_um"][0], out=df["YDisplacement_um"])
     for i in range(4):
         df[f"X{i+1}"] = data.coord[:, 0, i]
         df[f"Y{i+1}"] = data.coord[:, 1, i]
@@ -197,7 +222,7 @@ def export_kamenskiy_format(
     df["Pxy"] = sig.P[:, 0, 1]
     df["Pyx"] = sig.P[:, 1, 0]
     df["Pyy"] = sig.P[:, 1, 1]
-    return pd.DataFrame.from_dict(df)
+    return df.frame()
 
 
 def export_prepped_format(
@@ -207,14 +232,20 @@ def export_prepped_format(
     sig: Kinetics,
     erg: Energy,
     shear: Vec[f64],
+    set_name: str,
+    cycle: Vec[char],
 ) -> pd.DataFrame:
-    df = dict()
+    df = FrameBuilder(
+        SpecDataFormat, len(data.time), INT_SIZE_FIELDS, kin.F.dtype, WIDE_FIELDS
+    )
+    df["SetName"] = set_name
+    df["Cycle"] = cycle
     df["Time_S"] = data.time
-    df["XSize_um"] = data.XSize_um.astype(int)
-    df["YSize_um"] = data.YSize_um.astype(int)
-    df["ZSize_um"] = 1000.0 * sig.ZSize_mm
-    df["XDisplacement_um"] = df["XSize_um"] - df["XSize_um"][0]
-    df["YDisplacement_um"] = df["YSize_um"] - df["YSize_um"][0]
+    df["XSize_um"] = data.XSize_um
+    df["YSize_um"] = data.YSize_um
+    np.multiply(1000.0, sig.ZSize_mm, out=df["ZSize_um"])
+    np.subtract(df["XSize_um"], df["XSize_um"][0], out=df["XDisplacement_um"])
+    np.subtract(df["YSize_um"], df["YSize_um"][0], out=df["YDisplacement_um"])
     df["XForce_mN"] = data.XForce_mN
     df["YForce_mN"] = data.YForce_mN
     df["Temperature"] = data.Temperature
@@ -261,4 +292,4 @@ def export_prepped_format(
     df["plotting"] = tag.plotting
     df["relax"] = tag.relax
     df["creep"] = tag.creep
-    return pd.DataFrame.from_dict(df)
+    return df.frame()
@@ -0,0 +1,126 @@
+__all__ = ["ProtocolIndex", "SpecimenIndex", "build_specimen_index"]
+import dataclasses as dc
+import re
+from typing import Final
+import numpy as np
+import pandas as pd
+from .columnar import factorize_text
+from ..datatypes import CycleTypes
+from ..types import *
+
+CYCLE_NUMBER: Final = re.compile(r"(\d+)-.+")
+# A set or cycle missing from the table gets code -1, which lands on a False sentinel
+NO_CYCLE: Final[int] = -2
+
+
+def contains(names: pd.Index, word: str) -> Vec[bool_]:
+    flags = [word in str(s).lower() for s in names]
+    return np.array(flags + [False], dtype=bool)
+
+
+def contiguous_rows(rows: Vec[i32]) -> slice | Vec[i32]:
+    if rows[-1] - rows[0] + 1 == len(rows):
+        return slice(int(rows[0]), int(rows[-1]) + 1)
+    return rows
+
+
+def find_last_cycle_code(names: pd.Index, codes: Vec[i32]) -> int:
+    cycles = dict()
+    # later cycles with the same number win, in order of appearance like the original
+    for c in pd.unique(codes):
+        g = CYCLE_NUMBER.match(str(names[c])) if c >= 0 else None
+        if g:
+            cycles[int(g.group(1))] = int(c)
+    return cycles[max(cycles.keys())] if cycles else NO_CYCLE
+
+
+@dc.dataclass(slots=True)
+class ProtocolIndex:
+    rows: slice | Vec[i32]
+    set_code: int
+    cycle_codes: Vec[i32]
+    last_cycle: int
+
+
+@dc.dataclass(slots=True)
+class SpecimenIndex:
+    """
+    Built once per specimen: the rows of every SetName plus the substring flags of
+    each SetName and Cycle category, so protocols never rescan the full frame.
+    """
+
+    n_rows: int
+    protocols: dict[str, ProtocolIndex]
+    precond: Vec[bool_]
+    equib: Vec[bool_]
+    relax: Vec[bool_]
+    creep: Vec[bool_]
+    preload: Vec[bool_]
+    stretch: Vec[bool_]
+    recover: Vec[bool_]
+    first_valid: int
+
+    def rows(self, name: str) -> slice | Vec[i32]:
+        return self.protocols[name].rows
+
+    def only(self, name: str) -> "SpecimenIndex":
+        # Small enough to send to a worker with a single protocol job
+        return dc.replace(self, protocols={name: self.protocols[name]})
+
+    def cycle_types(self, name: str) -> CycleTypes:
+        p = self.protocols[name]
+        cycle = p.cycle_codes
+        precond = np.full(len(cycle), self.precond[p.set_code])
+        preload = self.preload[cycle]
+        equibx = self.equib[p.set_code] & ~preload
+        last_cycle = cycle == p.last_cycle
+        # the original compares SetName against a bool, so last_eb never matches
+        last_eb = np.zeros(len(cycle), dtype=bool)
+        plotting = ~precond & ~preload & last_cycle
+        fitting = plotting & ~(equibx ^ last_eb)
+        return CycleTypes(
+            precond.astype(int),
+            equibx.astype(int),
+            (self.relax[p.set_code] & ~preload).astype(int),
+            (self.creep[p.set_code] & ~preload).astype(int),
+            preload.astype(int),
+            self.stretch[cycle].astype(int),
+            self.recover[cycle].astype(int),
+            last_cycle.astype(int),
+            last_eb.astype(int),
+            plotting.astype(int),
+            fitting.astype(int),
+        )
+
+
+def build_specimen_index(raw: pd.DataFrame) -> SpecimenIndex:
+    set_codes, set_names = factorize_text(raw["SetName"])
+    cycle_codes, cycle_names = factorize_text(raw["Cycle"])
+    order = np.argsort(set_codes, kind="stable").astype(np.int32)
+    starts = np.searchsorted(set_codes[order], np.arange(len(set_names)))
+    protocols = dict()
+    for k, rows in enumerate(np.split(order, starts)[1:]):
+        if len(rows) == 0:  # unused category
+            continue
+        rows = contiguous_rows(rows)
+        protocols[str(set_names[k])] = ProtocolIndex(
+            rows,
+            k,
+            cycle_codes[rows],
+            find_last_cycle_code(cycle_names, cycle_codes[rows]),
+        )
+    precond = contains(set_names, "precond")
+    preload = contains(cycle_names, "preload")
+    valid = np.flatnonzero(~precond[set_codes] & ~preload[cycle_codes])
+    return SpecimenIndex(
+        len(raw),
+        protocols,
+        precond,
+        contains(set_names, "equib"),
+        contains(set_names, "relax"),
+        contains(set_names, "creep"),
+        preload,
+        contains(cycle_names, "stretch"),
+        contains(cycle_names, "recover"),
+        int(valid[0]) if len(valid) > 0 else -1,
+    )
@@ -1,88 +1,208 @@
-from glob import glob
-from typing import Literal
+import hashlib
+import json
+from typing import Any, Final, Literal
 import numpy as np
 import pandas as pd
-from scipy import interpolate
+from .columnar import ColumnarFrame, concat_frames
+from ..tools.logging import BasicLogger
 from ..datatypes import *
-from ..parsers.parser import parser
-
-
-def parse_cmdline_args(
-    cmd_args: list[str] | None, method: Literal["file", "dir"] = "file"
-):
-    args = parser.parse_args(cmd_args)
-    match method:
-        case "file":
-            names = [s for name in args.names for s in glob(name) if os.path.isfile(s)]
-        case "dir":
-            names = [s for name in args.names for s in glob(name) if os.path.isdir(s)]
-    return InputArgs(
-        names,
-        LogLevel[args.log_level],
-        ProgramSettings(
-            FileFormat[args.input_format],
-            FileFormat[args.export_format],
-            WriteMode[args.write_mode],
-            StressMethodOption[args.method],
-            ReferenceStateOption[args.ref],
-            args.tag,
-            args.n_cores,
-            args.overwrite,
-        ),
-    )
-
-
-def repair_array_by_interpolation(time: Vec[f64], serie: pd.Series):
-    x = serie.apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
-    if ~np.isnan(x).any():
-        return x
-    valid_pos = np.where(~np.isnan(x))
-    fi = interpolate.interp1d(time[valid_pos], x[valid_pos])
-    return fi(time)
-
-
-def create_export_name(
-    name: str, setting: ProgramSettings, arg_type: Literal["file", "dir"] = "file"
-) -> str | None:
-    match arg_type:
-        case "file":
-            folder = os.path.dirname(name)
-        case "dir":
-            folder = name
-    match setting.stress_method:
-        case StressMethodOption.CAUCHY:
-            ex_name = path(folder, f"{setting.tag} - corrected")
-        case StressMethodOption.PK1 | StressMethodOption.NOMINAL:
-            ex_name = path(folder, f"{setting.tag} - raw")
-    match setting.export_format:
-        case FileFormat.CSV | FileFormat.AUTO:
-            ex_name = ex_name + ".csv"
-        case FileFormat.EXCEL:
-            ex_name = ex_name + ".xlsx"
-    if os.path.isfile(ex_name) and not setting.overwrite:
-        return None
-    return ex_name
+from ..parsers.cmdline import create_export_name, parse_cmdline_args
+
+
+def fill_gaps_by_interpolation(time: Vec[f64], x: Vec[f64], gaps: Vec[bool_]) -> None:
+    valid = ~gaps
+    order = np.argsort(time[valid], kind="stable")
+    x[gaps] = np.interp(time[gaps], time[valid][order], x[valid][order])
+
 
+def repair_frame_by_interpolation(
+    time: Vec[f64], raw: pd.DataFrame, columns: list[str]
+) -> dict[str, int]:
+    text = [k for k in columns if raw[k].dtype != np.float64]
+    if text:
+        raw[text] = raw[text].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    gaps = raw[columns].isna().to_numpy()
+    counts = gaps.sum(axis=0)
+    for j in np.flatnonzero(counts):
+        x = raw[columns[j]].to_numpy(np.float64, copy=True)
+        fill_gaps_by_interpolation(time, x, gaps[:, j])
+        raw[columns[j]] = x
+    return {k: int(n) for k, n in zip(columns, counts)}
 
-def import_bx_dataframe(name: str, fmt: FileFormat) -> pd.DataFrame:
+
+def create_report_name(ex_name: str) -> str:
+    return f"{os.path.splitext(ex_name)[0]} - profile.json"
+
+
+def load_bx_table(name: str, fmt: FileFormat = FileFormat.AUTO) -> pd.DataFrame:
     if fmt is FileFormat.AUTO:
         ext = os.path.splitext(name)[1]
-        match ext:
-            case ".xlsx" | ".xls":
-                fmt = FileFormat.EXCEL
-            case ".csv":
-                fmt = FileFormat.CSV
-            case _:
-                raise ValueError(f"File extension {ext} not recognized.")
+        if ext not in FILE_FORMAT_EXTENSIONS:
+            raise ValueError(f"File extension {ext} not recognized.")
+        fmt = FILE_FORMAT_EXTENSIONS[ext]
     match fmt:
         case FileFormat.CSV:
-            raw = pd.read_csv(name)
+            return pd.read_csv(name)
         case FileFormat.EXCEL:
-            raw = pd.concat(pd.read_excel(name, sheet_name=None), ignore_index=True)
-    time = raw["Time_S"].to_numpy(dtype=np.float64)
-    for k in raw.columns[3:]:
-        raw[k] = repair_array_by_interpolation(time, raw[k])
-    return raw.rename(columns=BIAX_DATA_ALIASES)
+            return pd.concat(pd.read_excel(name, sheet_name=None), ignore_index=True)
+        case FileFormat.PARQUET:
+            return pd.read_parquet(name)
+        case FileFormat.FEATHER:
+            return pd.read_feather(name)
+        case FileFormat.NPZ:
+            col, meta = ColumnarFrame.load_npz(name)
+            return restore_dtypes(col.to_frame(), meta)
+    raise ValueError(f"File format {fmt} cannot be read.")
+
+
+def read_bx_dataframe(
+    name: str, fmt: FileFormat, log: BasicLogger | None = None
+) -> pd.DataFrame:
+    log = BasicLogger(LogLevel.NULL) if log is None else log
+    with log.stage("import") as stage:
+        raw = load_bx_table(name, fmt)
+        stage.rows = len(raw)
+    with log.stage("repair", len(raw)):
+        time = raw["Time_S"].to_numpy(dtype=np.float64)
+        raw.attrs["repaired"] = repair_frame_by_interpolation(
+            time, raw, list(raw.columns[3:])
+        )
+    raw = raw.rename(columns=BIAX_DATA_ALIASES)
+    # Protocol and cycle names repeat on every row, keep one copy of each
+    for k in BIAX_TEXT_COLUMNS:
+        raw[k] = raw[k].astype("category")
+    return raw
+
+
+def describe_dtypes(df: pd.DataFrame, col: ColumnarFrame) -> str:
+    # only extension dtypes differ from their block, record them to restore on load
+    dtypes = {
+        k: str(df[k].dtype)
+        for t, names in col.numeric.items()
+        for k in names
+        if str(df[k].dtype) != t
+    }
+    return json.dumps(dtypes)
+
+
+def restore_dtypes(df: pd.DataFrame, meta: dict[str, str]) -> pd.DataFrame:
+    dtypes = json.loads(meta.get("dtypes", "{}"))
+    return df.astype(dtypes) if dtypes else df
+
+
+CACHE_VERSION: Final[int] = 4
+
+
+def create_cache_name(name: str) -> str:
+    return path(os.path.dirname(name), f".{os.path.basename(name)}.bxcache.npz")
+
+
+def create_cache_key(name: str, fmt: FileFormat) -> str:
+    # Hashing the bytes is far cheaper than parsing them, and a copied or touched
+    # file with the same contents still hits the cache
+    with open(name, "rb") as f:
+        digest = hashlib.file_digest(f, "sha1").hexdigest()
+    token = [CACHE_VERSION, digest, fmt]
+    return hashlib.sha1("|".join(map(str, token)).encode()).hexdigest()
+
+
+def load_cached_dataframe(cache: str, key: str) -> pd.DataFrame | None:
+    if not os.path.isfile(cache):
+        return None
+    try:
+        col, meta = ColumnarFrame.load_npz(cache)
+    except (OSError, KeyError, ValueError):
+        return None
+    if meta.get("key") != key:
+        return None
+    raw = restore_dtypes(col.to_frame(), meta)
+    raw.attrs["repaired"] = dict()
+    return raw
+
+
+def save_cached_dataframe(cache: str, key: str, raw: pd.DataFrame) -> None:
+    tmp = cache + ".tmp"
+    col = ColumnarFrame.from_frame(raw)
+    col.save_npz(tmp, key=key, dtypes=describe_dtypes(raw, col))
+    os.replace(tmp, cache)
+
+
+def import_bx_dataframe(
+    name: str, fmt: FileFormat, cache: bool = False, log: BasicLogger | None = None
+) -> pd.DataFrame:
+    if not cache:
+        return read_bx_dataframe(name, fmt, log)
+    log = BasicLogger(LogLevel.NULL) if log is None else log
+    cache_name = create_cache_name(name)
+    key = create_cache_key(name, fmt)
+    with log.stage("import_cache") as stage:
+        raw = load_cached_dataframe(cache_name, key)
+        stage.rows = 0 if raw is None else len(raw)
+    if raw is None:
+        raw = read_bx_dataframe(name, fmt, log)
+        save_cached_dataframe(cache_name, key, raw)
+    return raw
+
+
+def create_manifest_name(ex_name: str) -> str:
+    return path(os.path.dirname(ex_name), f".{os.path.basename(ex_name)}.manifest.json")
+
+
+def create_result_cache_name(folder: str, ex_name: str) -> str:
+    return path(folder, f".{os.path.basename(ex_name)}.bxcache.npz")
+
+
+def describe_inputs(files: list[str]) -> dict[str, list[int]]:
+    stats = {os.path.basename(f): os.stat(f) for f in files}
+    return {k: [s.st_size, s.st_mtime_ns] for k, s in sorted(stats.items())}
+
+
+def create_protocol_key(
+    inputs: dict[str, list[int]], spec: SpecimenInfo, setting: ProgramSettings
+) -> str:
+    # Protocol results also depend on the specimen dimensions and free floating state
+    token = [
+        CACHE_VERSION,
+        setting.stress_method,
+        setting.ref_state,
+        setting.precision,
+        json.dumps(inputs, sort_keys=True),
+        np.asarray(spec.dim, dtype=float).tobytes().hex(),
+        np.asarray(spec.x_iff, dtype=float).tobytes().hex(),
+        np.asarray(spec.y_iff, dtype=float).tobytes().hex(),
+    ]
+    return hashlib.sha1("|".join(map(str, token)).encode()).hexdigest()
+
+
+def load_manifest(name: str) -> dict[str, dict[str, Any]]:
+    if not os.path.isfile(name):
+        return dict()
+    try:
+        with open(name, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return dict()
+    if manifest.get("version") != CACHE_VERSION:
+        return dict()
+    return manifest.get("protocols", dict())
+
+
+def save_manifest(
+    name: str, setting: ProgramSettings, protocols: dict[str, dict[str, Any]]
+) -> None:
+    manifest = {
+        "version": CACHE_VERSION,
+        "settings": {
+            "method": setting.stress_method.value,
+            "ref": setting.ref_state.value,
+            "tag": setting.tag,
+        },
+        "protocols": protocols,
+    }
+    tmp = name + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, name)
 
 
 def export_bx_dataframe(
@@ -95,3 +215,94 @@ def export_bx_dataframe(
             df.to_csv(ex_name, index=False, mode=setting.export_mode.value)
         case FileFormat.EXCEL:
             df.to_excel(ex_name, index=False, engine="xlsxwriter")
+        case FileFormat.PARQUET:
+            df.to_parquet(ex_name, index=False)
+        case FileFormat.FEATHER:
+            df.reset_index(drop=True).to_feather(ex_name)
+        case FileFormat.NPZ:
+            col = ColumnarFrame.from_frame(df)
+            col.save_npz(ex_name, dtypes=describe_dtypes(df, col))
+
+
+class StreamingExporter:
+    """
+    Appends frames to the export file one at a time. CSV and Parquet are written
+    as they arrive; the other formats are collected and written on close. Output
+    goes to a partial file that only replaces ex_name once complete.
+    """
+
+    __slots__ = ["name", "partial", "setting", "frames", "writer", "rows"]
+    name: str
+    partial: str
+    setting: ProgramSettings
+    frames: list[pd.DataFrame]
+    writer: Any
+    rows: int
+
+    def __init__(self, ex_name: str, setting: ProgramSettings) -> None:
+        root, ext = os.path.splitext(ex_name)
+        self.name = ex_name
+        self.partial = f"{root}.part{ext}"
+        self.setting = setting
+        self.frames = list()
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        match self.setting.export_format:
+            case FileFormat.CSV | FileFormat.AUTO:
+                mode = self.setting.export_mode.value
+                if self.rows > 0:
+                    mode = mode.replace("w", "a")
+                df.to_csv(self.partial, index=False, mode=mode, header=self.rows == 0)
+            case FileFormat.PARQUET:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if self.writer is None:
+                    # Chunks differ in category count, so fix one index width for all
+                    schema = pa.schema(
+                        [
+                            (
+                                f.with_type(
+                                    pa.dictionary(pa.int32(), f.type.value_type)
+                                )
+                                if pa.types.is_dictionary(f.type)
+                                else f
+                            )
+                            for f in table.schema
+                        ],
+                        metadata=table.schema.metadata,
+                    )
+                    self.writer = pq.ParquetWriter(self.partial, schema)
+                self.writer.write_table(table.cast(self.writer.schema))
+            case _:
+                self.frames.append(df)
+        self.rows = self.rows + len(df)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        if self.frames:
+            df = concat_frames(self.frames)
+            self.frames.clear()
+            export_bx_dataframe(self.partial, df, self.setting)
+        if os.path.isfile(self.partial):
+            os.replace(self.partial, self.name)
+
+    def abort(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.frames.clear()
+        if os.path.isfile(self.partial):
+            os.remove(self.partial)
+
+    def __enter__(self) -> "StreamingExporter":
+        return self
+
+    def __exit__(self, exc_type, *_) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,70 @@
+"""
+Closed form operations on stacks of 2x2 tensors of shape (N, 2, 2). Every kernel
+takes an optional out buffer, which must not alias the inputs, and keeps the
+float type of its inputs.
+"""
+
+__all__ = [
+    "coldot2",
+    "colnorm2",
+    "det2",
+    "inv2",
+    "mul2",
+    "mul2_nt",
+    "mul2_tn",
+    "sym2",
+]
+import numpy as np
+from ..types import *
+
+
+def det2(A: MatV[f64], out: Vec[f64] | None = None) -> Vec[f64]:
+    out = np.multiply(A[:, 0, 0], A[:, 1, 1], out=out)
+    out -= A[:, 0, 1] * A[:, 1, 0]
+    return out
+
+
+def inv2(
+    A: MatV[f64], det: Vec[f64] | None = None, out: MatV[f64] | None = None
+) -> MatV[f64]:
+    if det is None:
+        det = det2(A)
+    if out is None:
+        out = np.empty_like(A)
+    neg = np.negative(det)
+    np.divide(A[:, 1, 1], det, out=out[:, 0, 0])
+    np.divide(A[:, 0, 1], neg, out=out[:, 0, 1])
+    np.divide(A[:, 1, 0], neg, out=out[:, 1, 0])
+    np.divide(A[:, 0, 0], det, out=out[:, 1, 1])
+    return out
+
+
+# A stacked matmul beats both einsum and unrolled component products for 2x2,
+# transposes are free strided views.
+def mul2(A: MatV[f64], B: MatV[f64], out: MatV[f64] | None = None) -> MatV[f64]:
+    return np.matmul(A, B, out=out)
+
+
+def mul2_tn(A: MatV[f64], B: MatV[f64], out: MatV[f64] | None = None) -> MatV[f64]:
+    return np.matmul(A.swapaxes(1, 2), B, out=out)
+
+
+def mul2_nt(A: MatV[f64], B: MatV[f64], out: MatV[f64] | None = None) -> MatV[f64]:
+    return np.matmul(A, B.swapaxes(1, 2), out=out)
+
+
+def sym2(A: MatV[f64], out: MatV[f64] | None = None) -> MatV[f64]:
+    out = np.add(A, A.swapaxes(1, 2), out=out)
+    out *= 0.5
+    return out
+
+
+# The column reductions stay on einsum, its fused loop beats the unrolled
+# strided products; the root is taken in place.
+def colnorm2(A: MatV[f64], out: Mat[f64] | None = None) -> Mat[f64]:
+    out = np.einsum("mij,mij->mj", A, A, out=out)
+    return np.sqrt(out, out=out)
+
+
+def coldot2(A: MatV[f64], out: Vec[f64] | None = None) -> Vec[f64]:
+    return np.einsum("mi,mi->m", A[:, :, 0], A[:, :, 1], out=out)
@@ -15,7 +15,12 @@ import os
 import dataclasses as dc
 import enum
 from .types import *
-from typing import Final, Literal
+from typing import TYPE_CHECKING, Final, Literal
+
+# numpy is imported where arrays are made, the console scripts load this module
+# before they know whether there is anything to process
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def path(*names: str) -> str:
@@ -36,6 +41,8 @@ BIAX_DATA_ALIASES: dict[str, str] = {
     "StressYY_kPa": "tyy",
 }
 
+BIAX_TEXT_COLUMNS: Final[tuple[str, ...]] = ("SetName", "Cycle")
+
 
 class LogLevel(enum.IntEnum):
     NULL = 0
@@ -56,9 +63,22 @@ class CycleState(enum.IntEnum):
 class FileFormat(enum.StrEnum):
     EXCEL = "EXCEL"
     CSV = "CSV"
+    PARQUET = "PARQUET"
+    FEATHER = "FEATHER"
+    NPZ = "NPZ"
     AUTO = "AUTO"
 
 
+FILE_FORMAT_EXTENSIONS: dict[str, FileFormat] = {
+    ".xlsx": FileFormat.EXCEL,
+    ".xls": FileFormat.EXCEL,
+    ".csv": FileFormat.CSV,
+    ".parquet": FileFormat.PARQUET,
+    ".feather": FileFormat.FEATHER,
+    ".npz": FileFormat.NPZ,
+}
+
+
 class WriteMode(enum.StrEnum):
     w = "w"
     wb = "wb"
@@ -76,6 +96,23 @@ class ReferenceStateOption(enum.StrEnum):
     FIRST = "FIRST"
 
 
+class ComputeBackend(enum.StrEnum):
+    NUMPY = "NUMPY"
+    NUMBA = "NUMBA"
+    NUMEXPR = "NUMEXPR"
+
+
+class Precision(enum.StrEnum):
+    FLOAT64 = "FLOAT64"
+    FLOAT32 = "FLOAT32"
+
+    @property
+    def dtype(self) -> "type[np.floating]":
+        import numpy as np
+
+        return np.float32 if self is Precision.FLOAT32 else np.float64
+
+
 @dc.dataclass(slots=True)
 class ProgramSettings:
     input_format: FileFormat
@@ -86,6 +123,12 @@ class ProgramSettings:
     tag: str
     cores: int
     overwrite: bool
+    cache: bool
+    profile: bool
+    backend: ComputeBackend
+    precision: Precision
+    watch: bool
+    watch_interval: float
 
 
 @dc.dataclass(slots=True)
@@ -93,6 +136,8 @@ class InputArgs:
     directory: list[str]
     loglevel: LogLevel
     settings: ProgramSettings
+    # as given on the command line, watch mode expands them again on every scan
+    patterns: list[str]
 
 
 @dc.dataclass(slots=True)
@@ -113,36 +158,88 @@ class SpecimenInfo:
     y_iff: Vec[f64]
 
 
+BX_FILE_COLUMNS: Final[tuple[str, ...]] = (
+    "time",
+    "stretch_x",
+    "stretch_y",
+    "shear",
+    "load_x",
+    "load_y",
+    "t_x",
+    "t_y",
+    "stress_x",
+    "stress_y",
+    *(f"x{i + 1}" for i in range(9)),
+    *(f"y{i + 1}" for i in range(9)),
+)
+# Column order of BXStruct.data: the file order with the first four markers of
+# each axis sorted by SACKS_NODE_ORDER, so that coord is a plain strided view
+BX_LAYOUT: Final[tuple[int, ...]] = (
+    *range(10),
+    *(10 + SACKS_NODE_ORDER[i] for i in range(4)),
+    *range(14, 19),
+    *(19 + SACKS_NODE_ORDER[i] for i in range(4)),
+    *range(23, 28),
+)
+
+
+class BXColumn:
+    __slots__ = ["index"]
+    index: int
+
+    def __init__(self, name: str) -> None:
+        self.index = BX_LAYOUT.index(BX_FILE_COLUMNS.index(name))
+
+    def __get__(self, obj: "BXStruct", objtype: type | None = None) -> Vec[f64]:
+        if obj is None:
+            return self
+        return obj.data[:, self.index]
+
+
 @dc.dataclass(slots=True)
 class BXStruct:
-    time: Vec[f64]
-    stretch_x: Vec[f64]
-    stretch_y: Vec[f64]
-    shear: Vec[f64]
-    load_x: Vec[f64]
-    load_y: Vec[f64]
-    t_x: Vec[f64]
-    t_y: Vec[f64]
-    stress_x: Vec[f64]
-    stress_y: Vec[f64]
-    x1: Vec[f64]
-    x2: Vec[f64]
-    x3: Vec[f64]
-    x4: Vec[f64]
-    x5: Vec[f64]
-    x6: Vec[f64]
-    x7: Vec[f64]
-    x8: Vec[f64]
-    x9: Vec[f64]
-    y1: Vec[f64]
-    y2: Vec[f64]
-    y3: Vec[f64]
-    y4: Vec[f64]
-    y5: Vec[f64]
-    y6: Vec[f64]
-    y7: Vec[f64]
-    y8: Vec[f64]
-    y9: Vec[f64]
+    data: Mat[f64]
+    time = BXColumn("time")
+    stretch_x = BXColumn("stretch_x")
+    stretch_y = BXColumn("stretch_y")
+    shear = BXColumn("shear")
+    load_x = BXColumn("load_x")
+    load_y = BXColumn("load_y")
+    t_x = BXColumn("t_x")
+    t_y = BXColumn("t_y")
+    stress_x = BXColumn("stress_x")
+    stress_y = BXColumn("stress_y")
+    x1 = BXColumn("x1")
+    x2 = BXColumn("x2")
+    x3 = BXColumn("x3")
+    x4 = BXColumn("x4")
+    x5 = BXColumn("x5")
+    x6 = BXColumn("x6")
+    x7 = BXColumn("x7")
+    x8 = BXColumn("x8")
+    x9 = BXColumn("x9")
+    y1 = BXColumn("y1")
+    y2 = BXColumn("y2")
+    y3 = BXColumn("y3")
+    y4 = BXColumn("y4")
+    y5 = BXColumn("y5")
+    y6 = BXColumn("y6")
+    y7 = BXColumn("y7")
+    y8 = BXColumn("y8")
+    y9 = BXColumn("y9")
+
+    @property
+    def coord(self) -> MatV[f64]:
+        from numpy.lib.stride_tricks import as_strided
+
+        # (N, 2, 4) view over markers 1-4 of x (columns 10-13) and y (19-22)
+        x = self.data[:, 10:]
+        return as_strided(
+            x,
+            shape=(len(x), 2, 4),
+            strides=(x.strides[0], 9 * x.strides[1], x.strides[1]),
+            writeable=False,
+        )
 
 
 @dc.dataclass(slots=True)
@@ -222,6 +319,13 @@ class CycleTypes:
     fitting: Vec[i32]
 
 
+@dc.dataclass(slots=True)
+class TimeState:
+    last: float = 0.0
+    step: float | None = None
+    total: float = 0.0
+
+
 @dc.dataclass(slots=True)
 class Kinematics:
     F: MatV[f64]
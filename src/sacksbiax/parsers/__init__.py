@@ -1 +1,2 @@
+from .cmdline import *
 from .parser import *
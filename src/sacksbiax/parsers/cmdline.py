@@ -0,0 +1,71 @@
+__all__ = ["create_export_name", "expand_names", "parse_cmdline_args"]
+from glob import glob
+from typing import Literal
+from .parser import parser
+from ..datatypes import *
+
+
+def expand_names(
+    patterns: list[str], method: Literal["file", "dir"] = "file"
+) -> list[str]:
+    match method:
+        case "file":
+            return [s for name in patterns for s in glob(name) if os.path.isfile(s)]
+        case "dir":
+            return [s for name in patterns for s in glob(name) if os.path.isdir(s)]
+
+
+def parse_cmdline_args(
+    cmd_args: list[str] | None, method: Literal["file", "dir"] = "file"
+):
+    args = parser.parse_args(cmd_args)
+    return InputArgs(
+        expand_names(args.names, method),
+        LogLevel[args.log_level],
+        ProgramSettings(
+            FileFormat[args.input_format],
+            FileFormat[args.export_format],
+            WriteMode[args.write_mode],
+            StressMethodOption[args.method],
+            ReferenceStateOption[args.ref],
+            args.tag,
+            args.n_cores,
+            args.overwrite,
+            not args.no_cache,
+            args.profile,
+            ComputeBackend[args.backend],
+            Precision[args.precision],
+            args.watch,
+            args.watch_interval,
+        ),
+        args.names,
+    )
+
+
+def create_export_name(
+    name: str, setting: ProgramSettings, arg_type: Literal["file", "dir"] = "file"
+) -> str | None:
+    match arg_type:
+        case "file":
+            folder = os.path.dirname(name)
+        case "dir":
+            folder = name
+    match setting.stress_method:
+        case StressMethodOption.CAUCHY:
+            ex_name = path(folder, f"{setting.tag} - corrected")
+        case StressMethodOption.PK1 | StressMethodOption.NOMINAL:
+            ex_name = path(folder, f"{setting.tag} - raw")
+    match setting.export_format:
+        case FileFormat.CSV | FileFormat.AUTO:
+            ex_name = ex_name + ".csv"
+        case FileFormat.EXCEL:
+            ex_name = ex_name + ".xlsx"
+        case FileFormat.PARQUET:
+            ex_name = ex_name + ".parquet"
+        case FileFormat.FEATHER:
+            ex_name = ex_name + ".feather"
+        case FileFormat.NPZ:
+            ex_name = ex_name + ".npz"
+    if os.path.isfile(ex_name) and not setting.overwrite:
+        return None
+    return ex_name
@@ -1,14 +1,15 @@
 __all__ = ["parser"]
 import argparse
 from ..datatypes import (
+    ComputeBackend,
     FileFormat,
     LogLevel,
+    Precision,
     ReferenceStateOption,
     StressMethodOption,
     WriteMode,
 )
 
-
 parser = argparse.ArgumentParser(
     "main", formatter_class=argparse.ArgumentDefaultsHelpFormatter
 )
@@ -66,3 +67,38 @@ parser.add_argument("--n-cores", "-n", type=int, default=1, help="Parallelizatio
 parser.add_argument(
     "--overwrite", action="store_true", help="Do not skip if export file is found"
 )
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Do not read or write cached imports and protocol results",
+)
+parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Report time and rows per stage and the process peak memory with each export",
+)
+parser.add_argument(
+    "--backend",
+    type=str.upper,
+    default="NUMPY",
+    choices=list(ComputeBackend.__members__),
+    help="Library for the array kernels, falls back to numpy if not installed",
+)
+parser.add_argument(
+    "--precision",
+    type=str.upper,
+    default="FLOAT64",
+    choices=list(Precision.__members__),
+    help="Float type of the kinematics, kinetics, energy and export. Time and W stay float64",
+)
+parser.add_argument(
+    "--watch",
+    action="store_true",
+    help="Keep running and process new or modified specimen files as they are written",
+)
+parser.add_argument(
+    "--watch-interval",
+    type=float,
+    default=2.0,
+    help="Seconds a watched file must stay unchanged to count as fully written",
+)
@@ -83,12 +83,8 @@ def get_initial_free_floating(
         dims[1] * data.stretch_y[0],
         dims[2] / data.stretch_x[0] / data.stretch_y[0],
     )
-    x_ref = np.array(
-        [getattr(data, f"x{SACKS_NODE_ORDER[i] + 1}")[0] for i in range(4)], dtype=float
-    )
-    y_ref = np.array(
-        [getattr(data, f"y{SACKS_NODE_ORDER[i] + 1}")[0] for i in range(4)], dtype=float
-    )
+    x_ref = np.array(data.coord[0, 0], dtype=float)
+    y_ref = np.array(data.coord[0, 1], dtype=float)
     return dims, x_ref, y_ref
 
 
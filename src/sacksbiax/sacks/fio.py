@@ -1,26 +1,51 @@
-from dataclasses import fields
+from functools import lru_cache
 import numpy as np
+import pandas as pd
 from ..datatypes import *
 
 
+BX_NCOLS: Final[int] = len(BX_FILE_COLUMNS)
+
+
+def parse_bxfile(name: str) -> Mat[f64]:
+    table = pd.read_csv(
+        name, sep=r"\s+", header=None, comment="#", dtype=np.float64, engine="c"
+    ).to_numpy()
+    if table.shape[1] != BX_NCOLS:
+        raise ValueError(
+            f">>>[FATAL]: {name} has {table.shape[1]} columns, expected {BX_NCOLS}"
+        )
+    raw = np.empty_like(table, order="F")
+    for j, k in enumerate(BX_LAYOUT):
+        raw[:, j] = table[:, k]
+    # Shared by every caller through the cache below
+    raw.flags.writeable = False
+    return raw
+
+
+# Only the first cycle of a specimen is read twice, by get_initial_free_floating
+# and by its own cycle job, so there is no need to keep more matrices alive
+@lru_cache(maxsize=2)
+def load_bxfile(name: str, size: int, mtime: int) -> Mat[f64]:
+    return parse_bxfile(name)
+
+
 def import_bxfile(name: str):
-    raw = np.loadtxt(name)
-    return BXStruct(**{k.name: raw[:, i] for i, k in enumerate(fields(BXStruct))})
+    stat = os.stat(name)
+    raw = load_bxfile(os.path.abspath(name), stat.st_size, stat.st_mtime_ns)
+    return BXStruct(raw)
 
 
-def convert_bxfile(spec: SpecimenInfo, name: str):
+def convert_bxfile(spec: SpecimenInfo, name: str, dtype: type = np.float64):
     raw = import_bxfile(name)
-    coord = np.empty((len(raw.x1), 2, 4), dtype=float)
-    for i in range(4):
-        coord[:, 0, i] = getattr(raw, f"x{SACKS_NODE_ORDER[i]+1}")
-        coord[:, 1, i] = getattr(raw, f"y{SACKS_NODE_ORDER[i]+1}")
+    # time is accumulated by fix_time, so it is always kept in float64
     return RawBiaxFormat(
         raw.time,
-        (1000.0 * spec.dim[0]) * raw.stretch_x,
-        (1000.0 * spec.dim[1]) * raw.stretch_y,
-        9.80665 * raw.load_x,
-        9.80665 * raw.load_y,
-        np.full_like(raw.time, 37),
-        raw.shear,
-        coord,
+        ((1000.0 * spec.dim[0]) * raw.stretch_x).astype(dtype, copy=False),
+        ((1000.0 * spec.dim[1]) * raw.stretch_y).astype(dtype, copy=False),
+        (9.80665 * raw.load_x).astype(dtype, copy=False),
+        (9.80665 * raw.load_y).astype(dtype, copy=False),
+        np.full(len(raw.time), 37, dtype=dtype),
+        raw.shear.astype(dtype, copy=False),
+        raw.coord.astype(dtype, copy=False),
     )
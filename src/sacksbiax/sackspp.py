@@ -1,10 +1,16 @@
+from concurrent import futures
 from glob import glob
 import dataclasses as dc
+import time
+from typing import Any
 import pandas as pd
+from .cli import run
 from .tools.logging import BasicLogger
+from .tools.scheduler import map_ordered, process_pool
 from .datatypes import *
 from .core.core import *
 from .core.io import *
+from .core.columnar import concat_frames
 from .sacks import parse_specimen, convert_bxfile
 
 
@@ -14,34 +20,50 @@ def core_loop(
     spec: SpecimenInfo,
     setting: ProgramSettings,
     cycle: int,
+    set_name: str,
     log: BasicLogger,
 ):
     log.debug(f"Working on cycle {name}")
-    data = convert_bxfile(spec, name)
+    with log.stage("import") as stage:
+        data = convert_bxfile(spec, name, setting.precision.dtype)
+        stage.rows = n = len(data.time)
     log.debug(f"Computing kinematics")
-    kinematics = compute_kinematics(def_grad, data)
+    with log.stage("kinematics", n):
+        kinematics, origin = compute_kinematics_with_origin(
+            def_grad, spec, data, setting.backend
+        )
     log.debug(f"Computing kinetics")
-    match setting.stress_method:
-        case StressMethodOption.CAUCHY:
-            kinetics = compute_kinetics_cauchy(spec, kinematics, data)
-        case StressMethodOption.PK1:
-            kinetics = compute_kinetics_pk1(spec, kinematics, data)
-        case StressMethodOption.NOMINAL:
-            kinetics = compute_kinetics_nominal(spec, kinematics, data)
+    with log.stage("kinetics", n):
+        match setting.stress_method:
+            case StressMethodOption.CAUCHY:
+                kinetics = compute_kinetics_cauchy(
+                    spec, kinematics, origin, data, setting.cores, setting.backend
+                )
+            case StressMethodOption.PK1:
+                kinetics = compute_kinetics_pk1(
+                    spec, kinematics, origin, data, setting.backend
+                )
+            case StressMethodOption.NOMINAL:
+                kinetics = compute_kinetics_nominal(
+                    spec, kinematics, origin, data, setting.backend
+                )
     log.debug(f"Computing shear angle")
-    shear = compute_shear_angle(kinematics)
+    with log.stage("shear", n):
+        shear = compute_shear_angle(kinematics)
     log.debug(f"Finding loading and and unloading points")
     log.debug(f"Compiling data from cycle")
-    df = export_kamenskiy_format(data, kinematics, kinetics, shear)
-    cycle_state = parse_cycle(kinematics, cycle)
-    df["Cycle"] = cycle_state
+    with log.stage("output", n):
+        cycle_state = parse_cycle(kinematics, cycle)
+        df = export_kamenskiy_format(
+            data, kinematics, kinetics, shear, set_name, cycle_state
+        )
     log.debug(f"Finished processing cycle!")
     return df
 
 
-def process_protocol(
+def plan_protocol(
     test: BXProtocol, spec: SpecimenInfo, setting: ProgramSettings, log: BasicLogger
-) -> pd.DataFrame | None:
+) -> list[tuple] | None:
     cycles = sorted(glob(rf"{test.d}/t_*.bx"))
     if len(cycles) == 0:
         log.info(f"No BX file found in {test.name}. Protocol is skipped.")
@@ -50,56 +72,167 @@ def process_protocol(
     x_ref, y_ref = import_ref_markers(path(test.d, "marker.ref"))
     def_grad = BiaxialKinematics(x_ref, y_ref)
     # cycles = [f"{test.d}/t_1 .bx"]
-    df = pd.concat(
-        [
-            core_loop(c, def_grad, spec, setting, i, log)
-            for i, c in enumerate(cycles, start=1)
-        ],
-        ignore_index=True,
-    )
-    df["SetName"] = test.name
-    df = df[[s.name for s in dc.fields(KamenskiyFormat)]]
+    return [
+        (c, def_grad, spec, setting, i, test.name, log)
+        for i, c in enumerate(cycles, start=1)
+    ]
+
+
+def assemble_protocol(
+    test: BXProtocol, frames: list[pd.DataFrame], log: BasicLogger
+) -> pd.DataFrame:
+    df = concat_frames(frames)
     log.debug(f"Finished processing protocol!")
     return df
 
 
+def process_protocol(
+    test: BXProtocol,
+    spec: SpecimenInfo,
+    setting: ProgramSettings,
+    log: BasicLogger,
+    pool: futures.Executor | None = None,
+) -> pd.DataFrame | None:
+    jobs = plan_protocol(test, spec, setting, log)
+    if jobs is None:
+        return None
+    weights = [os.path.getsize(j[0]) for j in jobs]
+    return assemble_protocol(
+        test, list(map_ordered(core_loop, jobs, weights, pool, log, setting.cores)), log
+    )
+
+
+def describe_protocol(
+    test: BXProtocol, spec: SpecimenInfo, setting: ProgramSettings
+) -> dict[str, Any]:
+    files = sorted(glob(rf"{test.d}/t_*.bx"))
+    marker = path(test.d, "marker.ref")
+    if os.path.isfile(marker):
+        files.append(marker)
+    inputs = describe_inputs(files)
+    return {"key": create_protocol_key(inputs, spec, setting), "inputs": inputs}
+
+
+def load_protocol_result(
+    test: BXProtocol,
+    key: str,
+    ex_name: str,
+    spec: SpecimenInfo,
+    setting: ProgramSettings,
+    log: BasicLogger,
+) -> pd.DataFrame | None:
+    cache = create_result_cache_name(test.d, ex_name)
+    with log.stage("import_cache") as stage:
+        df = load_cached_dataframe(cache, key)
+        stage.rows = 0 if df is None else len(df)
+    if df is not None:
+        log.info(f"Protocol {test.name} unchanged, cached results reused")
+        return df
+    log.info(f"Cached results of {test.name} not found, recomputing")
+    df = process_protocol(test, spec, setting, log)
+    if df is not None:
+        save_cached_dataframe(cache, key, df)
+    return df
+
+
 def main_loop(
     name: str,
     setting: ProgramSettings,
     log: BasicLogger,
-):
+    pool: futures.Executor | None = None,
+) -> tuple[int, int]:
     ex_name = create_export_name(name, setting, arg_type="dir")
     if ex_name is None:
         log.info(f"{name} already processed, skipped.")
-        return
+        return 0, 0
     log.info(f"Working on specimen {name}")
+    log.specimen, mark = name, len(log.records)
     spec = parse_specimen(name)
-    df = pd.concat(
-        [
-            process_protocol(t, spec, setting, log)
-            for _, t in sorted(spec.tests.items())
-        ],
-        ignore_index=True,
-    )
-    log.debug(f"Fixing Time array to always increasing")
-    df["Time_S"] = fix_time(df["Time_S"].to_numpy(dtype=float))
+    tests = [t for _, t in sorted(spec.tests.items())]
+    # Protocols whose inputs and settings match the manifest are not recomputed
+    manifest_name = create_manifest_name(ex_name)
+    previous = load_manifest(manifest_name) if setting.cache else dict()
+    current = [describe_protocol(t, spec, setting) for t in tests]
+    reuse = [
+        previous.get(os.path.basename(t.d), {}).get("key") == c["key"]
+        for t, c in zip(tests, current)
+    ]
+    plans = [
+        None if r else plan_protocol(t, spec, setting, log)
+        for t, r in zip(tests, reuse)
+    ]
+    # Cycles of every protocol share the pool, results come back in cycle order
+    jobs = [j for p in plans if p for j in p]
+    if len(jobs) < 2:
+        # in-process, so the stress solve can thread over setting.cores
+        pool = None
+    elif pool is not None:
+        # each worker process owns a single core, so no nested stress threads
+        worker = dc.replace(setting, cores=1)
+        jobs = [(c, g, s, worker, i, n, l) for c, g, s, _, i, n, l in jobs]
+    weights = [os.path.getsize(j[0]) for j in jobs]
+    frames = map_ordered(core_loop, jobs, weights, pool, log, setting.cores)
     log.info(f"Exporting results to {setting.export_format}: {ex_name}")
-    export_bx_dataframe(ex_name, df, setting)
+    clock = TimeState()
+    done = dict()
+    with StreamingExporter(ex_name, setting) as export:
+        for t, p, r, c in zip(tests, plans, reuse, current):
+            if r:
+                df = load_protocol_result(t, c["key"], ex_name, spec, setting, log)
+            elif p:
+                df = assemble_protocol(t, [next(frames) for _ in p], log)
+                if setting.cache:
+                    cache = create_result_cache_name(t.d, ex_name)
+                    save_cached_dataframe(cache, c["key"], df)
+            else:
+                df = None
+            if df is None:
+                continue
+            done[os.path.basename(t.d)] = c
+            log.debug(f"Fixing Time array to always increasing")
+            df["Time_S"] = fix_time(
+                df["Time_S"].to_numpy(dtype=float), clock, setting.backend
+            )
+            with log.stage("export", len(df)):
+                export.write(df)
+    if setting.cache:
+        save_manifest(manifest_name, setting, done)
+    if setting.profile:
+        log.write_report(create_report_name(ex_name), log.records[mark:])
     log.info(f"Processing complete!!!\n")
+    return len(jobs), export.rows
 
 
-def main(args: InputArgs, log: BasicLogger):
-    for name in args.directory:
-        main_loop(name, args.settings, log)
+def main(
+    args: InputArgs,
+    log: BasicLogger,
+    pool: futures.ProcessPoolExecutor | None = None,
+):
+    backend = get_backend(args.settings.backend)
+    if backend.name != args.settings.backend:
+        log.warn(f"{args.settings.backend} is not installed, using {backend.name}")
+        args.settings.backend = backend.name
+    start = time.perf_counter()
+    n_files, n_rows = 0, 0
+    if args.settings.cores > 1:
+        with process_pool(args.settings.cores, pool) as exec:
+            for name in args.directory:
+                files, rows = main_loop(name, args.settings, log, pool=exec)
+                n_files, n_rows = n_files + files, n_rows + rows
+    else:
+        for name in args.directory:
+            files, rows = main_loop(name, args.settings, log)
+            n_files, n_rows = n_files + files, n_rows + rows
+    elapsed = time.perf_counter() - start
+    log.info(
+        f"Processed {n_files} cycle files ({n_rows} rows) from "
+        f"{len(args.directory)} specimens in {elapsed:.1f} s, "
+        f"{n_files / elapsed:.1f} files/s, {n_rows / elapsed:.0f} rows/s"
+    )
 
 
 def main_cli(cmd_args: list[str] | None = None):
-    args = parse_cmdline_args(cmd_args, method="dir")
-    log = BasicLogger(args.loglevel)
-    try:
-        main(args, log)
-    except Exception as e:
-        log.exception(e)
+    run("sackspp", cmd_args, arg_type="dir")
 
 
 if __name__ == "__main__":
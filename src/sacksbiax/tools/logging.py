@@ -1,6 +1,14 @@
-__all__ = ["BasicLogger"]
+__all__ = ["BasicLogger", "StageRecord"]
 from ..datatypes import LogLevel
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Iterator
+import csv
+import dataclasses as dc
+import json
+import sys
+import time
 import traceback
 
 
@@ -8,12 +16,37 @@ def now() -> str:
     return datetime.now().strftime("%H:%M:%S")
 
 
+def process_peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+@dc.dataclass(slots=True)
+class StageRecord:
+    specimen: str
+    stage: str
+    rows: int = 0
+    wall_s: float = 0.0
+    # Highest RSS of the process so far when the stage ended, not of the stage
+    # alone: ru_maxrss never goes down, so only growth over earlier stages shows
+    process_peak_rss_mb: float = 0.0
+
+
 class BasicLogger:
-    __slots__ = ["level"]
+    __slots__ = ["level", "specimen", "records"]
     level: LogLevel
+    specimen: str
+    records: list[StageRecord]
 
     def __init__(self, level: LogLevel) -> None:
         self.level = level
+        self.specimen = ""
+        self.records = list()
 
     def print(self, msg: str, level: LogLevel):
         print(f"{now()}[{level.name:5}]>>> {msg}")
@@ -41,3 +74,60 @@ class BasicLogger:
     def exception(self, e: Exception):
         print(traceback.format_exc())
         print(e)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[StageRecord]:
+        """
+        Times the enclosed block as one pipeline stage. Works as a decorator too.
+        The yielded record can be updated with the row count once it is known.
+        """
+        record = StageRecord(self.specimen, name, rows)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - start
+            record.process_peak_rss_mb = process_peak_rss_mb()
+            self.records.append(record)
+            self.debug(f"{name}: {record.rows} rows in {record.wall_s:.3f} s")
+
+    def write_report(self, name: str, records: list[StageRecord] | None = None):
+        records = self.records if records is None else records
+        fields = [f.name for f in dc.fields(StageRecord)]
+        with open(name, "w", newline="") as f:
+            if name.endswith(".json"):
+                json.dump([dc.asdict(r) for r in records], f, indent=2)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(fields)
+                writer.writerows(dc.astuple(r) for r in records)
+
+    def summary(self) -> None:
+        table: dict[str, StageRecord] = dict()
+        for r in self.records:
+            total = table.setdefault(r.stage, StageRecord("", r.stage))
+            total.rows = total.rows + r.rows
+            total.wall_s = total.wall_s + r.wall_s
+            total.process_peak_rss_mb = max(
+                total.process_peak_rss_mb, r.process_peak_rss_mb
+            )
+        calls = Counter(r.stage for r in self.records)
+        wall = sum(r.wall_s for r in table.values())
+        row = "{:<12}{:>8}{:>12}{:>11}{:>7}{:>12}{:>16}"
+        print(
+            row.format(
+                "stage", "calls", "rows", "wall [s]", "%", "rows/s", "process peak MB"
+            )
+        )
+        for k, r in table.items():
+            print(
+                row.format(
+                    k,
+                    calls[k],
+                    r.rows,
+                    f"{r.wall_s:.3f}",
+                    f"{100 * r.wall_s / wall if wall > 0 else 0.0:.1f}",
+                    f"{r.rows / r.wall_s if r.wall_s > 0 else 0.0:.0f}",
+                    f"{r.process_peak_rss_mb:.1f}",
+                )
+            )
@@ -0,0 +1,65 @@
+__all__ = ["balanced_order", "map_ordered", "process_pool", "profiled_call"]
+from concurrent import futures
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+from .logging import BasicLogger
+
+
+def balanced_order(weights: Sequence[int]) -> list[int]:
+    # Largest first, so a heavy job submitted last does not leave the pool idle
+    return sorted(range(len(weights)), key=lambda k: weights[k], reverse=True)
+
+
+@contextmanager
+def process_pool(
+    cores: int, pool: futures.ProcessPoolExecutor | None = None
+) -> Iterator[futures.ProcessPoolExecutor]:
+    "Borrows the long lived pool of watch mode if given, otherwise owns one"
+    if pool is not None:
+        yield pool
+        return
+    with futures.ProcessPoolExecutor(cores) as exec:
+        yield exec
+
+
+def profiled_call(
+    fn: Callable[..., Any], log: BasicLogger, args: tuple
+) -> tuple[Any, list]:
+    # log arrives as the worker's own copy, hand its stage records back to the parent
+    log.records = list()
+    return fn(*args), log.records
+
+
+def map_ordered(
+    fn: Callable[..., Any],
+    jobs: Sequence[tuple],
+    weights: Sequence[int] | None = None,
+    pool: futures.Executor | None = None,
+    log: BasicLogger | None = None,
+    workers: int = 1,
+) -> Iterator[Any]:
+    if pool is None:
+        for args in jobs:
+            yield fn(*args)
+        return
+    # Finished results wait in their futures until they are yielded in order, so
+    # only jobs k..k+limit-1, two per worker of the pool, are ever in flight,
+    # heaviest first, to bound memory
+    limit = 2 * max(1, workers)
+    # threads already share log, only worker processes need their records merged
+    merge = log is not None and isinstance(pool, futures.ProcessPoolExecutor)
+    pending: dict[int, futures.Future] = dict()
+    for k in range(len(jobs)):
+        ahead = [j for j in range(k, min(k + limit, len(jobs))) if j not in pending]
+        if weights is not None:
+            ahead = [ahead[i] for i in balanced_order([weights[j] for j in ahead])]
+        for j in ahead:
+            if merge:
+                pending[j] = pool.submit(profiled_call, fn, log, jobs[j])
+            else:
+                pending[j] = pool.submit(fn, *jobs[j])
+        result = pending.pop(k).result()
+        if merge:
+            result, records = result
+            log.records.extend(records)
+        yield result
@@ -0,0 +1,112 @@
+__all__ = ["SharedFrameHandle", "SharedFrame"]
+import dataclasses as dc
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from ..core.columnar import ColumnarFrame
+
+
+@dc.dataclass(slots=True, frozen=True)
+class SharedFrameHandle:
+    values: str
+    codes: str
+    n_rows: int
+    columns: list[str]
+    numeric: dict[str, list[str]]
+    coded: list[str]
+    categories: list[list[str]]
+
+
+def _offsets(numeric: dict[str, list[str]], n_rows: int) -> tuple[list[int], int]:
+    # The dtype blocks are packed back to back, each starting 8 byte aligned
+    offsets, end = list(), 0
+    for t, names in numeric.items():
+        offsets.append(end)
+        end += -(-np.dtype(t).itemsize * len(names) * n_rows // 8) * 8
+    return offsets, end
+
+
+def _allocate(n_bytes: int, name: str | None = None) -> shared_memory.SharedMemory:
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=max(n_bytes, 1))
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrame:
+    """
+    A DataFrame placed in shared memory blocks by the parent with create(), and
+    attached by worker processes from its picklable handle without copying.
+    """
+
+    __slots__ = ["handle", "frame", "blocks", "owner"]
+    handle: SharedFrameHandle
+    frame: pd.DataFrame | None
+    blocks: tuple[shared_memory.SharedMemory, shared_memory.SharedMemory]
+    owner: bool
+
+    def __init__(self, handle: SharedFrameHandle) -> None:
+        self.handle = handle
+        self.owner = False
+        self.blocks = (_allocate(0, handle.values), _allocate(0, handle.codes))
+        self.frame = ColumnarFrame(
+            handle.columns,
+            handle.numeric,
+            handle.coded,
+            *self.views(),
+            handle.categories,
+        ).to_frame()
+
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> "SharedFrame":
+        numeric, coded = ColumnarFrame.layout(df)
+        n_rows = len(df)
+        blocks = (
+            _allocate(_offsets(numeric, n_rows)[1]),
+            _allocate(4 * len(coded) * n_rows),
+        )
+        obj = cls.__new__(cls)
+        obj.owner = True
+        obj.frame = None
+        obj.blocks = blocks
+        obj.handle = SharedFrameHandle(
+            blocks[0].name, blocks[1].name, n_rows, [], numeric, coded, []
+        )
+        col = ColumnarFrame.from_frame(df, *obj.views())
+        obj.handle = dc.replace(
+            obj.handle, columns=col.columns, categories=col.categories
+        )
+        return obj
+
+    def views(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        h = self.handle
+        offsets, _ = _offsets(h.numeric, h.n_rows)
+        values = {
+            t: np.ndarray(
+                (len(names), h.n_rows),
+                dtype=t,
+                buffer=self.blocks[0].buf,
+                offset=offset,
+            )
+            for (t, names), offset in zip(h.numeric.items(), offsets)
+        }
+        codes = np.ndarray(
+            (len(h.coded), h.n_rows), dtype=np.int32, buffer=self.blocks[1].buf
+        )
+        return values, codes
+
+    def close(self) -> None:
+        self.frame = None
+        for b in self.blocks:
+            try:
+                b.close()
+            except BufferError:
+                # A view is still alive somewhere, the mapping goes with the process
+                pass
+            if self.owner:
+                b.unlink()
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,139 @@
+"""
+Reports input files that appeared or changed once the writer is done with them,
+i.e. their size and mtime held still for a full interval. On Linux inotify wakes
+the scan as soon as something is written, elsewhere the folders are polled.
+"""
+
+__all__ = ["FileWatcher"]
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import Callable
+
+# sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class Inotify:
+    __slots__ = ["libc", "fd"]
+
+    def __init__(self) -> None:
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        # AttributeError without inotify in libc, e.g. on macOS
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, folder: str) -> None:
+        # Watching a folder twice only refreshes its mask, failures fall back on polling
+        self.libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_EVENTS)
+
+    def wait(self, timeout: float) -> None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            try:
+                os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Polling:
+    __slots__ = []
+
+    def add(self, folder: str) -> None:
+        pass
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(timeout)
+
+    def close(self) -> None:
+        pass
+
+
+def open_events() -> Inotify | Polling:
+    try:
+        return Inotify()
+    except (AttributeError, OSError, TypeError):
+        return Polling()
+
+
+class FileWatcher:
+    """
+    find lists the current input files. Files found on construction count as seen,
+    poll returns the ones created or modified since, once fully written.
+    """
+
+    __slots__ = ["find", "roots", "interval", "events", "seen", "pending"]
+    find: Callable[[], list[str]]
+    roots: list[str]
+    interval: float
+    events: Inotify | Polling
+    seen: dict[str, tuple[int, int]]
+    pending: dict[str, tuple[tuple[int, int], float]]
+
+    def __init__(
+        self, find: Callable[[], list[str]], roots: list[str], interval: float
+    ) -> None:
+        self.find = find
+        self.roots = roots
+        self.interval = interval
+        self.events = open_events()
+        self.seen = self.scan()
+        self.pending = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.events.close()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        files = dict()
+        for name in self.find():
+            try:
+                stat = os.stat(name)
+            except OSError:
+                continue
+            files[name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self) -> list[str]:
+        # new folders, e.g. a new specimen or protocol, are watched as they appear
+        for root in self.roots:
+            for folder, _, _ in os.walk(root):
+                self.events.add(folder)
+        if self.pending:
+            # the files are stat-ed again after the interval anyway
+            time.sleep(self.interval)
+        else:
+            self.events.wait(self.interval)
+        now = time.monotonic()
+        current = self.scan()
+        for name, stat in current.items():
+            if self.seen.get(name) == stat:
+                self.pending.pop(name, None)
+            elif name not in self.pending or self.pending[name][0] != stat:
+                self.pending[name] = (stat, now)
+        ready = [
+            name
+            for name, (stat, since) in self.pending.items()
+            if stat[0] > 0 and now - since >= self.interval
+        ]
+        for name in ready:
+            self.seen[name] = self.pending.pop(name)[0]
+        # deleted files are forgotten, so they count as new if written again
+        self.seen = {k: v for k, v in self.seen.items() if k in current}
+        self.pending = {k: v for k, v in self.pending.items() if k in current}
+        return sorted(ready)
@@ -1,11 +1,16 @@
 __all__ = ["Arr", "bool_", "f64", "i32", "char", "Vec", "Mat", "MatV"]
-import numpy as np
+from typing import TYPE_CHECKING
 
-Arr = np.ndarray
-f64 = np.dtype[np.float64]
-i32 = np.dtype[np.int32]
-char = np.dtype[np.str_]
-bool_ = np.dtype[np.bool_]
+# Alias values are only evaluated by type checkers, so annotating with them at
+# runtime does not import numpy, e.g. in datatypes for the console scripts
+if TYPE_CHECKING:
+    import numpy as np
+
+type Arr = np.ndarray
+type f64 = np.dtype[np.float64]
+type i32 = np.dtype[np.int32]
+type char = np.dtype[np.str_]
+type bool_ = np.dtype[np.bool_]
 
 type Vec[T: (i32, f64, char, bool_)] = np.ndarray[tuple[int], T]
 type Mat[T: (i32, f64, char, bool_)] = np.ndarray[tuple[int, int], T]
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+from sacksbiax.core.backends import get_backend
+from sacksbiax.core.biax import stress_homogenous
+from sacksbiax.datatypes import ComputeBackend, Precision, TimeState
+
+OPTIONAL = {ComputeBackend.NUMBA: "numba", ComputeBackend.NUMEXPR: "numexpr"}
+
+
+@pytest.fixture(params=list(ComputeBackend), ids=str)
+def backend(request):
+    if request.param in OPTIONAL:
+        pytest.importorskip(OPTIONAL[request.param])
+    backend = get_backend(request.param)
+    assert backend.name == request.param
+    return backend
+
+
+@pytest.fixture(params=list(Precision), ids=str)
+def precision(request) -> Precision:
+    return request.param
+
+
+@pytest.fixture
+def inputs(precision) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    n = 2000
+    F = np.eye(2) + rng.normal(0.0, 0.2, (n, 2, 2))
+    S = rng.normal(0.0, 50.0, (n, 2, 2))
+    x = {
+        "F": F,
+        "tFinv": np.linalg.inv(F).swapaxes(1, 2),
+        "f1": rng.normal(0.0, 100.0, n),
+        "f2": rng.normal(0.0, 100.0, n),
+        "C": np.matmul(F.swapaxes(1, 2), F),
+        "S": 0.5 * (S + S.swapaxes(1, 2)),
+    }
+    return {k: v.astype(precision.dtype) for k, v in x.items()}
+
+
+def assert_close(res, ref, rtol: float, atol: float = 0.0) -> None:
+    # References are computed in float64 from the same inputs, float32 results
+    # may differ by its round off on the scale of the values
+    if res.dtype == np.float32:
+        scale = float(np.max(np.abs(ref), initial=1.0))
+        rtol, atol = max(rtol, 1e-5), max(atol, 1e-5 * scale)
+    np.testing.assert_allclose(res, ref, rtol=rtol, atol=atol)
+
+
+def restarted_clock(n: int, seed: int = 0) -> np.ndarray:
+    # Concatenated protocols restart their clock, giving negative jumps
+    rng = np.random.default_rng(seed)
+    time = np.cumsum(rng.uniform(0.0, 0.1, n))
+    time[rng.integers(1, n, n // 50)] = 0.0
+    return time
+
+
+def fix_time_loop(time: np.ndarray) -> np.ndarray:
+    dt = np.diff(time, prepend=[0.0])
+    for i in range(1, len(dt)):
+        if dt[i] < 0.0:
+            dt[i] = dt[i - 1]
+    return np.add.accumulate(dt)
+
+
+def test_kinematics(backend, inputs):
+    F = inputs["F"]
+    J, Finv, C = backend.kinematics(F)
+    assert J.dtype == Finv.dtype == C.dtype == F.dtype
+    F = F.astype(np.float64)
+    assert_close(J, np.linalg.det(F), rtol=1e-12)
+    assert_close(Finv, np.linalg.inv(F), rtol=1e-10, atol=1e-12)
+    assert_close(C, np.einsum("mki,mkj->mij", F, F), rtol=1e-12)
+
+
+def test_stretches(backend, inputs):
+    F = inputs["F"]
+    res = backend.stretches(F)
+    assert res.shape == (len(F), 2) and res.dtype == F.dtype
+    assert_close(res, np.linalg.norm(F.astype(np.float64), axis=1), rtol=1e-12)
+
+
+def test_stress(backend, inputs):
+    tFinv, f1, f2 = inputs["tFinv"], inputs["f1"], inputs["f2"]
+    res = backend.stress(tFinv, f1, f2)
+    assert res.shape == (len(tFinv), 3) and res.dtype == tFinv.dtype
+    x = [np.asarray(v, dtype=np.float64) for v in (tFinv, f1, f2)]
+    ref = np.array([stress_homogenous(t, a, b) for t, a, b in zip(*x)])
+    assert_close(res, ref, rtol=1e-8, atol=1e-8)
+
+
+def test_energy(backend, inputs):
+    dE, dH, dW, W = backend.energy(inputs["C"], inputs["S"])
+    assert dE.dtype == dH.dtype == dW.dtype == inputs["C"].dtype
+    C, S = inputs["C"].astype(np.float64), inputs["S"].astype(np.float64)
+    ref_dE = np.diff(C, axis=0, prepend=np.zeros((1, 2, 2)))
+    ref_dH = np.zeros_like(ref_dE)
+    ref_dH[:-1] = ref_dE[1:] * S[:-1]
+    ref_dH[1:] += ref_dE[1:] * S[1:]
+    ref_dW = ref_dH.sum(axis=(1, 2))
+    assert_close(dE, ref_dE, rtol=1e-12, atol=1e-12)
+    assert_close(dH, ref_dH, rtol=1e-12, atol=1e-9)
+    assert_close(dW, ref_dW, rtol=1e-12, atol=1e-9)
+    # W is accumulated in float64 from the increments in either precision
+    np.testing.assert_allclose(W, np.cumsum(dW, dtype=np.float64), rtol=1e-9, atol=1e-6)
+    assert W.dtype == np.float64
+
+
+def test_fix_time(backend):
+    time = restarted_clock(5000)
+    res = backend.fix_time(time, TimeState())
+    assert res.dtype == np.float64
+    np.testing.assert_allclose(res, fix_time_loop(time), rtol=1e-12)
+    assert np.all(np.diff(res) >= 0.0)
+
+
+@pytest.mark.parametrize("cuts", [[1], [7, 2500, 2501], [0, 0, 4999], [1000, 1000]])
+def test_fix_time_chunked(backend, cuts):
+    # The state carries the clock over chunk borders, empty chunks included
+    time = restarted_clock(5000, seed=1)
+    state = TimeState()
+    res = np.concatenate([backend.fix_time(t, state) for t in np.split(time, cuts)])
+    np.testing.assert_allclose(res, fix_time_loop(time), rtol=1e-12)
+    assert state.total == pytest.approx(res[-1])
+
+
+def test_fix_time_chunked_at_restarts(backend):
+    # Every chunk but the first opens with a negative jump
+    time = restarted_clock(5000, seed=2)
+    cuts = np.flatnonzero(np.diff(time) < 0.0) + 1
+    state = TimeState()
+    res = np.concatenate([backend.fix_time(t, state) for t in np.split(time, cuts)])
+    np.testing.assert_allclose(res, fix_time_loop(time), rtol=1e-12)
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sacksbiax.core.columnar import ColumnarFrame
+from sacksbiax.core.io import describe_dtypes, load_bx_table
+from sacksbiax.datatypes import FileFormat, Precision
+from sacksbiax.tools.shared import SharedFrame
+
+
+def export_frame(n: int, precision: Precision) -> pd.DataFrame:
+    # Laid out like an export, Time_S and W stay float64 in every precision
+    rng = np.random.default_rng(0)
+    compact = precision == Precision.FLOAT32
+    df = pd.DataFrame(
+        {
+            "Time_S": np.linspace(0.0, 100.0, n),
+            "Protocol": pd.Categorical(rng.choice(["p1", "p2"], n)),
+            "XSize_um": rng.integers(0, 5000, n).astype(
+                np.int32 if compact else np.int64
+            ),
+        }
+    )
+    for k in ["P11", "P12", "P21", "P22", "E11", "E12", "E21", "E22"]:
+        df[k] = rng.normal(0.0, 50.0, n).astype(precision.dtype)
+    df["W"] = rng.normal(0.0, 1.0, n)
+    return df
+
+
+def save_npz(name: str, df: pd.DataFrame) -> None:
+    col = ColumnarFrame.from_frame(df)
+    col.save_npz(name, dtypes=describe_dtypes(df, col))
+
+
+@pytest.mark.parametrize("precision", list(Precision), ids=str)
+def test_npz_keeps_column_dtypes(tmp_path, precision):
+    df = export_frame(1000, precision)
+    name = str(tmp_path / "out.npz")
+    save_npz(name, df)
+    with np.load(name) as npz:
+        blocks = {k[7:] for k in npz.files if k.startswith("values_")}
+    assert blocks == {str(df[k].dtype) for k in df.columns if k != "Protocol"}
+    res = load_bx_table(name, FileFormat.NPZ)
+    pd.testing.assert_frame_equal(res, df)
+
+
+def test_float32_npz_is_smaller(tmp_path):
+    size = dict()
+    for precision in Precision:
+        name = str(tmp_path / f"{precision}.npz")
+        save_npz(name, export_frame(20000, precision))
+        size[precision] = os.path.getsize(name)
+    assert size[Precision.FLOAT32] < 0.7 * size[Precision.FLOAT64]
+
+
+def test_extension_dtypes_are_restored(tmp_path):
+    df = pd.DataFrame({"a": pd.array([1.0, None, 3.0], dtype="Float64")})
+    name = str(tmp_path / "out.npz")
+    save_npz(name, df)
+    pd.testing.assert_frame_equal(load_bx_table(name, FileFormat.NPZ), df)
+
+
+def test_shared_frame_keeps_column_dtypes():
+    df = export_frame(1000, Precision.FLOAT32)
+    with SharedFrame.create(df) as owner:
+        with SharedFrame(owner.handle) as shared:
+            pd.testing.assert_frame_equal(shared.frame, df)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sacksbiax.core.biax import stress_homogenous, stress_homogenous_batched
+
+
+def random_stack(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    F = np.eye(2) + rng.normal(0.0, 0.2, (n, 2, 2))
+    tFinv = np.linalg.inv(F).swapaxes(1, 2)
+    return tFinv, rng.normal(0.0, 100.0, n), rng.normal(0.0, 100.0, n)
+
+
+def near_singular_stack(n: int, seed: int = 1):
+    # Columns of F^-T almost parallel, det down to 1e-6 of the entries
+    rng = np.random.default_rng(seed)
+    tFinv, f1, f2 = random_stack(n, seed)
+    eps = np.logspace(-6, -2, n)
+    tFinv[:, :, 1] = tFinv[:, :, 0] + eps[:, None] * rng.normal(size=(n, 2))
+    return tFinv, f1, f2
+
+
+def rowwise(tFinv, f1, f2) -> np.ndarray:
+    return np.array([stress_homogenous(t, a, b) for t, a, b in zip(tFinv, f1, f2)])
+
+
+def relative_error(tFinv, ref, res) -> np.ndarray:
+    # Round-off of either solve grows with the condition number of the system
+    A = np.zeros((len(tFinv), 4, 3))
+    A[:, 0, :2] = A[:, 1, 1:] = tFinv[:, 0]
+    A[:, 2, :2] = A[:, 3, 1:] = tFinv[:, 1]
+    scale = np.finfo(float).eps * np.linalg.cond(A) ** 2
+    err = np.linalg.norm(res - ref, axis=1) / np.linalg.norm(ref, axis=1)
+    return err / scale
+
+
+@pytest.mark.parametrize("make", [random_stack, near_singular_stack])
+def test_batched_matches_rowwise(make):
+    tFinv, f1, f2 = make(500)
+    ref = rowwise(tFinv, f1, f2)
+    res = stress_homogenous_batched(tFinv, f1, f2)
+    assert res.shape == (500, 3)
+    assert np.all(relative_error(tFinv, ref, res) < 10.0)
+
+
+def test_batched_well_conditioned_to_round_off():
+    tFinv, f1, f2 = random_stack(1000, seed=2)
+    ref = rowwise(tFinv, f1, f2)
+    np.testing.assert_allclose(
+        stress_homogenous_batched(tFinv, f1, f2), ref, rtol=1e-9, atol=1e-9
+    )
+
+
+def test_batched_empty():
+    tFinv, f1, f2 = random_stack(0)
+    assert stress_homogenous_batched(tFinv, f1, f2).shape == (0, 3)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from sacksbiax.core.tensor import *
+from sacksbiax.datatypes import Precision
+
+REFERENCES = {
+    det2: (lambda A, B: np.linalg.det(A), 1),
+    inv2: (lambda A, B: np.linalg.inv(A), 1),
+    mul2: (lambda A, B: np.einsum("mij,mjk->mik", A, B), 2),
+    mul2_tn: (lambda A, B: np.einsum("mji,mjk->mik", A, B), 2),
+    mul2_nt: (lambda A, B: np.einsum("mij,mkj->mik", A, B), 2),
+    sym2: (lambda A, B: 0.5 * (A + A.swapaxes(1, 2)), 1),
+    colnorm2: (lambda A, B: np.sqrt(np.einsum("mij,mij->mj", A, A)), 1),
+    coldot2: (lambda A, B: np.einsum("mi,mi->m", A[:, :, 0], A[:, :, 1]), 1),
+}
+
+
+@pytest.fixture(params=list(Precision), ids=str)
+def precision(request) -> Precision:
+    return request.param
+
+
+@pytest.fixture
+def tensors(precision) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    A = np.eye(2) + rng.normal(0.0, 0.2, (2000, 2, 2))
+    B = np.eye(2) + rng.normal(0.0, 0.2, (2000, 2, 2))
+    return A.astype(precision.dtype), B.astype(precision.dtype)
+
+
+@pytest.mark.parametrize("kernel", list(REFERENCES), ids=lambda k: k.__name__)
+def test_kernel_matches_reference(kernel, tensors, precision):
+    A, B = tensors
+    reference, n_args = REFERENCES[kernel]
+    expected = reference(A.astype(np.float64), B.astype(np.float64))
+    res = kernel(*(A, B)[:n_args])
+    assert res.dtype == precision.dtype
+    rtol = 1e-5 if precision == Precision.FLOAT32 else 1e-12
+    np.testing.assert_allclose(res, expected, rtol=rtol, atol=rtol)
+    out = np.empty_like(res)
+    assert kernel(*(A, B)[:n_args], out=out) is out
+    np.testing.assert_array_equal(out, res)